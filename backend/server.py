@@ -1,19 +1,32 @@
-from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Form, Query
+from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Form, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs import AsyncGridFSBucket
+from gridfs.errors import NoFile
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Any, Union, Tuple
 import os
 import json
 import uuid
 import asyncio
 from datetime import datetime, timezone, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient, UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from dotenv import load_dotenv
 import httpx
-import base64
 import re
 import math
+import hashlib
+import time
+import orjson
+import binascii
+import mimetypes
+import pybase64
+from cachetools import TTLCache
+import numpy as np
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 import asyncio
 import aiofiles
@@ -22,7 +35,7 @@ from collections import defaultdict
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Ocean Hazard Alert API", version="2.0.0")
+app = FastAPI(title="Ocean Hazard Alert API", version="2.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -35,8 +48,14 @@ app.add_middleware(
 
 # MongoDB connection
 MONGO_URL = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncMongoClient(MONGO_URL)
 db = client.ocean_hazards
+media_bucket = AsyncGridFSBucket(db, bucket_name="media")
+MEDIA_UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Uploads are served from the API origin, so only passive media types are accepted;
+# SVG is an image type but can carry script
+MEDIA_ALLOWED_TYPE_PREFIXES = ("image/", "video/", "audio/")
+MEDIA_BLOCKED_TYPES = {"image/svg+xml"}
 
 # API Keys
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
@@ -140,6 +159,20 @@ class AnalyticsData(BaseModel):
     source_distribution: Dict[str, int]
     trend_data: List[Dict] = []
 
+class AIAnalysis(BaseModel):
+    """LLM analysis of a report, validated before it is cached or stored"""
+    hazard_type: str
+    severity: str
+    panic_index: int = Field(ge=0, le=100)
+    sentiment: str
+    confidence_score: float = Field(ge=0, le=1)
+    verification_needed: bool
+    extracted_keywords: List[Any] = []
+    location_mentions: List[Any] = []
+    urgency_indicators: List[Any] = []
+    risk_assessment: str = ""
+    recommended_actions: List[Any] = []
+
 # Multilingual text translations
 TRANSLATIONS = {
     'en': {
@@ -169,6 +202,133 @@ HAZARD_KEYWORDS = {
     'hi': ['सुनामी', 'चक्रवात', 'तूफान', 'बाढ़', 'भूकंप', 'आपातकाल', 'खतरा']
 }
 
+# Keyword heuristic that classifies short, unambiguous English reports without the LLM
+HEURISTIC_HAZARD_KEYWORDS = {
+    'tsunami': ('Tsunami', 'Critical', 90),
+    'tidal wave': ('Tsunami', 'Critical', 90),
+    'cyclone': ('Cyclone', 'High', 80),
+    'hurricane': ('Cyclone', 'High', 80),
+    'typhoon': ('Cyclone', 'High', 80),
+    'storm surge': ('Cyclone', 'High', 75),
+    'flood': ('Flood', 'High', 70),
+    'oil spill': ('Oil Spill', 'Medium', 55),
+    'oil leak': ('Oil Spill', 'Medium', 50),
+    'earthquake': ('Earthquake', 'High', 75)
+}
+HEURISTIC_URGENCY_KEYWORDS = ['urgent', 'emergency', 'evacuate', 'evacuation', 'immediate', 'massive', 'severe', 'extreme', 'danger']
+HEURISTIC_MINOR_KEYWORDS = ['minor', 'small', 'contained']
+# Negated, cancelled or hypothetical reports ("no tsunami", "false alarm", "drill") go to the LLM,
+# bypassing both the heuristic and the semantic cache (embeddings barely register negation)
+HEURISTIC_NEGATION_PATTERN = re.compile(
+    r"\b(?:not|no|never|none|nothing|false alarms?|cancell?ed|called off|drills?|rumou?rs?|hoax(?:es)?|fake)\b"
+    r"|n['’]t\b"
+)
+HEURISTIC_SEVERITY_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+HEURISTIC_MAX_WORDS = 40
+HEURISTIC_MIN_CONFIDENCE = 0.7
+
+# Which path answered each AI analysis request, for tuning the thresholds above
+ai_routing_metrics = defaultdict(int)
+
+# Exact-match cache for AI analysis: duplicate reports during an incident skip the LLM
+ai_exact_cache = TTLCache(maxsize=10000, ttl=600)
+
+# Semantic cache for AI analysis (embeddings persisted in the ai_cache collection)
+EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+AI_CACHE_SIMILARITY_THRESHOLD = 0.92
+# Entries expire from MongoDB after AI_CACHE_TTL; each language keeps at most
+# AI_CACHE_MAX_ENTRIES in memory, overwriting the oldest once full
+AI_CACHE_TTL = 7 * 24 * 3600  # seconds
+AI_CACHE_MAX_ENTRIES = 10000
+
+_embedding_model = None  # loaded at startup; stays None (semantic cache off) if loading fails
+_ai_cache_index = None  # language -> {"keys", "slot_keys", "results", "matrix", "next"}
+_ai_cache_lock = None
+
+# Fields callers rely on (see AIAnalysis); the streamed AI reply is used as soon as these are decoded
+AI_REQUIRED_FIELDS = ("hazard_type", "severity", "panic_index", "sentiment", "confidence_score", "verification_needed")
+AI_ANALYSIS_STRUCTURE = """{
+        "hazard_type": "Cyclone|Oil Spill|Flood|Tsunami|Earthquake|Other",
+        "severity": "Low|Medium|High|Critical",
+        "panic_index": 0-100,
+        "sentiment": "positive|negative|neutral|urgent|panic",
+        "confidence_score": 0.0-1.0,
+        "verification_needed": true|false,
+        "extracted_keywords": ["keyword1", "keyword2"],
+        "location_mentions": ["location1", "location2"],
+        "urgency_indicators": ["indicator1", "indicator2"],
+        "risk_assessment": "detailed risk analysis",
+        "recommended_actions": ["action1", "action2"]
+    }"""
+
+# Concurrent AI analysis requests are micro-batched into a single LLM call
+AI_BATCH_MAX_SIZE = 8
+AI_BATCH_WINDOW = 0.05  # seconds
+_ai_batch_queue = None
+_ai_batch_worker = None
+_ai_batch_tasks = set()
+
+# LLM calls are bounded by a timeout; repeated failures open a circuit breaker that
+# skips the LLM and returns the fallback analysis until the provider recovers.
+# A single request (or a batch's first object) gets AI_REQUEST_TIMEOUT; every further
+# object in a batched reply then gets AI_BATCH_ITEM_TIMEOUT, so the budget scales with batch size
+AI_REQUEST_TIMEOUT = 3.0  # seconds
+AI_BATCH_ITEM_TIMEOUT = 2.0  # seconds
+# Hard bound on how long one report waits for the LLM, across batching, streaming and retries;
+# a report past it gets the fallback analysis and is reclassified later
+AI_CALLER_TIMEOUT = 5.0  # seconds
+AI_BREAKER_FAILURE_THRESHOLD = 5
+AI_BREAKER_OPEN_SECONDS = 30
+ai_circuit_breaker = {"failures": 0, "open_until": 0.0}
+
+# Reports that received the fallback analysis are classified again later
+AI_RETRY_DELAY = 10  # seconds
+_reclassification_tasks = set()
+
+# Reports whose AI classification is still missing ("pending") or is the fallback
+# ("degraded") carry classification_status, so a restart can requeue them
+CLASSIFICATION_PENDING = "pending"
+CLASSIFICATION_DEGRADED = "degraded"
+
+# Reports created with async classification, keyed by report id
+pending_classifications: Dict[str, asyncio.Task] = {}
+CLASSIFICATION_POLL_INTERVAL = 0.5  # seconds
+CLASSIFICATION_STREAM_TIMEOUT = 60  # seconds
+
+# Report list queries never need inline media (legacy rows may still carry base64 blobs)
+REPORT_LIST_PROJECTION = {"_id": 0, "media_items.base64_data": 0, "base_priority_score": 0, "classification_status": 0}
+
+# Fields read by map and hotspot aggregation
+REPORT_MAP_PROJECTION = {
+    "_id": 0, "id": 1, "location.latitude": 1, "location.longitude": 1, "severity": 1,
+    "hazard_type": 1, "description": 1, "created_at": 1, "verification_status": 1, "source": 1
+}
+SOCIAL_MAP_PROJECTION = {
+    "_id": 0, "id": 1, "location.latitude": 1, "location.longitude": 1, "platform": 1,
+    "content": 1, "sentiment": 1, "engagement_metrics": 1, "created_at": 1
+}
+HOTSPOT_MAP_PROJECTION = {
+    "_id": 0, "id": 1, "center_location.latitude": 1, "center_location.longitude": 1, "radius_km": 1,
+    "risk_level": 1, "report_count": 1, "social_media_count": 1, "dominant_hazard_type": 1,
+    "confidence_score": 1
+}
+
+# Map data is rebuilt at most every MAP_DATA_CACHE_TTL seconds, or sooner after writes
+MAP_DATA_CACHE_TTL = 15  # seconds
+map_data_cache = {"content": None, "expires": 0.0, "generation": 0}
+_map_data_lock = None
+
+# Dashboard statistics are kept in a single counters document, updated on every write
+REPORT_STATS_ID = "global"
+REPORT_STATS_FACETS = ("severity", "verification", "source", "language")
+
+# Priority scoring: the time-independent part is stored as base_priority_score at write time
+PRIORITY_SEVERITY_WEIGHTS = {"Low": 1, "Medium": 2, "High": 3, "Critical": 4}
+PRIORITY_REPORT_LIMIT = 15
+# Verification bonus (0-0.02) plus recency (0.02-0.2, since time_factor is capped at 1)
+# can move a report by at most this much
+PRIORITY_DYNAMIC_RANGE = 0.2
+
 # Helper functions
 def prepare_for_mongo(data):
     """Convert data for MongoDB storage"""
@@ -178,71 +338,734 @@ def prepare_for_mongo(data):
                 data[key] = value.isoformat()
     return data
 
-async def advanced_ai_analysis(text: str, language: str = 'en') -> Dict[str, Any]:
-    """Enhanced AI analysis with multilingual support and sentiment analysis"""
+def base_priority_score(severity: Optional[str], panic_index: Optional[int]) -> float:
+    """Time-independent part of a report's priority score"""
+    severity_score = PRIORITY_SEVERITY_WEIGHTS.get(severity, 2)
+    panic_score = (panic_index or 50) / 100
+    return (severity_score * 0.4) + (panic_score * 0.3)
+
+def priority_score(report: Dict[str, Any], base_score: float) -> float:
+    """Full priority score: stored base plus verification and recency factors"""
+    verification_bonus = 0.2 if report.get("verification_status") == "verified" else 0
+    
+    # Time decay (newer reports get higher priority)
+    hours_old = (datetime.now(timezone.utc) - datetime.fromisoformat(report["created_at"].replace('Z', '+00:00'))).total_seconds() / 3600
+    # Offline clients can send created_at from a fast clock; a future report counts as brand new
+    hours_old = max(0.0, hours_old)
+    time_factor = max(0.1, 1 - (hours_old / 48))  # Decay over 48 hours
+    
+    return base_score + (verification_bonus * 0.1) + (time_factor * 0.2)
+
+def report_to_mongo(report: HazardReport) -> Dict[str, Any]:
+    """Convert a report for MongoDB storage, including derived query fields"""
+    report_dict = prepare_for_mongo(report.model_dump())
+    report_dict["base_priority_score"] = base_priority_score(report.severity, report.panic_index)
+    return report_dict
+
+def is_allowed_media_type(content_type: Optional[str]) -> bool:
+    """Whether a media type is safe to store and serve inline"""
+    content_type = (content_type or "").split(';')[0].strip().lower()
+    return content_type.startswith(MEDIA_ALLOWED_TYPE_PREFIXES) and content_type not in MEDIA_BLOCKED_TYPES
+
+async def store_media(upload: UploadFile) -> MediaItem:
+    """Stream an uploaded file into GridFS chunk by chunk and return its media metadata"""
+    if not is_allowed_media_type(upload.content_type):
+        raise HTTPException(status_code=415, detail=f"Unsupported media type: {upload.content_type}")
+    grid_in = media_bucket.open_upload_stream(
+        upload.filename or "upload",
+        metadata={"content_type": upload.content_type}
+    )
+    size = 0
     try:
-        system_message = f"""You are an advanced ocean hazard analyst with multilingual capabilities. 
-        Analyze the given text and provide comprehensive analysis in JSON format.
-        
-        Text Language: {language}
-        
-        Provide analysis in this exact JSON structure:
-        {{
-            "hazard_type": "Cyclone|Oil Spill|Flood|Tsunami|Earthquake|Other",
-            "severity": "Low|Medium|High|Critical",
-            "panic_index": 0-100,
-            "sentiment": "positive|negative|neutral|urgent|panic",
-            "confidence_score": 0.0-1.0,
-            "extracted_keywords": ["keyword1", "keyword2"],
-            "location_mentions": ["location1", "location2"],
-            "urgency_indicators": ["indicator1", "indicator2"],
-            "verification_needed": true|false,
-            "risk_assessment": "detailed risk analysis",
-            "recommended_actions": ["action1", "action2"]
-        }}"""
-
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"analysis-{uuid.uuid4()}",
-            system_message=system_message
-        ).with_model("openai", "gpt-4o-mini")
-
-        user_message = UserMessage(text=f"Analyze this ocean hazard report: {text}")
-        response = await chat.send_message(user_message)
-        
-        try:
-            result = json.loads(response)
-            return result
-        except json.JSONDecodeError:
-            # Fallback analysis
-            return {
-                "hazard_type": "Other",
-                "severity": "Medium", 
-                "panic_index": 50,
-                "sentiment": "neutral",
-                "confidence_score": 0.5,
-                "extracted_keywords": [],
-                "location_mentions": [],
-                "urgency_indicators": [],
-                "verification_needed": True,
-                "risk_assessment": "Analysis completed",
-                "recommended_actions": ["Monitor situation", "Verify with local authorities"]
-            }
+        while True:
+            chunk = await upload.read(MEDIA_UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await grid_in.write(chunk)
+            size += len(chunk)
+        await grid_in.close()
+    except Exception:
+        # Remove the chunks already written for this file
+        await grid_in.abort()
+        raise
+    return MediaItem(
+        type=upload.content_type.split('/')[0] if upload.content_type else 'unknown',
+        url=f"/api/media/{grid_in._id}",
+        filename=upload.filename,
+        size=size
+    )
+
+def decode_inline_media(media_item: MediaItem) -> Optional[Tuple[bytes, Optional[str]]]:
+    """Decode a base64 media payload (sent by offline sync clients) into (content, content_type)
+
+    Accepts data: URLs and line-wrapped base64; raises a 400 for anything undecodable.
+    """
+    if not media_item.base64_data:
+        return None
+    data = media_item.base64_data
+    content_type = None
+    if data.startswith('data:'):
+        header, _, data = data.partition(',')
+        content_type = header[len('data:'):].split(';')[0] or None
+    try:
+        # SIMD-accelerated decode; large offline videos dominate sync payloads
+        content = pybase64.b64decode(re.sub(r'\s+', '', data), validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid base64 media: {media_item.filename or 'upload'}")
+    return content, content_type
+
+async def offload_inline_media(media_item: MediaItem, decoded: Optional[Tuple[bytes, Optional[str]]]) -> MediaItem:
+    """Move a decoded inline media payload into GridFS"""
+    if decoded is None:
+        return media_item
+    content, content_type = decoded
+    content_type = content_type or mimetypes.guess_type(media_item.filename or "")[0]
+    file_id = await media_bucket.upload_from_stream(
+        media_item.filename or "upload",
+        content,
+        metadata={"content_type": content_type} if is_allowed_media_type(content_type) else None
+    )
+    return media_item.model_copy(update={
+        "base64_data": None,
+        "url": f"/api/media/{file_id}",
+        "size": len(content)
+    })
+
+def heuristic_ai_analysis(text: str, language: str = 'en', hazard_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Keyword-based analysis for clear-cut reports; None when the LLM should decide"""
+    if language != 'en' or len(text.split()) > HEURISTIC_MAX_WORDS:
+        return None
+
+    text_lower = text.lower()
+    if HEURISTIC_NEGATION_PATTERN.search(text_lower):
+        return None
+
+    def mentions(keyword: str) -> bool:
+        return re.search(rf"\b{re.escape(keyword)}", text_lower) is not None
+
+    hazard_matches = [keyword for keyword in HEURISTIC_HAZARD_KEYWORDS if mentions(keyword)]
+    detected_types = {HEURISTIC_HAZARD_KEYWORDS[keyword][0] for keyword in hazard_matches}
+    if len(detected_types) != 1:
+        return None
+    urgency_matches = [keyword for keyword in HEURISTIC_URGENCY_KEYWORDS if mentions(keyword)]
+    minor_matches = [keyword for keyword in HEURISTIC_MINOR_KEYWORDS if mentions(keyword)]
+    if urgency_matches and minor_matches:
+        return None
+
+    detected_type, severity, panic_index = max(
+        (HEURISTIC_HAZARD_KEYWORDS[keyword] for keyword in hazard_matches), key=lambda match: match[2]
+    )
+    level = HEURISTIC_SEVERITY_LEVELS.index(severity)
+    if urgency_matches:
+        level = min(level + 1, len(HEURISTIC_SEVERITY_LEVELS) - 1)
+        panic_index = min(panic_index + 15, 100)
+    elif minor_matches:
+        level = max(level - 1, 0)
+        panic_index = max(panic_index - 20, 0)
+    severity = HEURISTIC_SEVERITY_LEVELS[level]
+
+    # Each agreeing signal (keyword hit, modifier, reporter's hazard type) adds confidence
+    signals = len(hazard_matches) + len(urgency_matches) + len(minor_matches)
+    if hazard_type and hazard_type.lower() == detected_type.lower():
+        signals += 1
+    confidence = min(0.95, 0.45 + 0.15 * signals)
+    if confidence < HEURISTIC_MIN_CONFIDENCE:
+        return None
+
+    return {
+        "hazard_type": detected_type,
+        "severity": severity,
+        "panic_index": panic_index,
+        "sentiment": "urgent" if urgency_matches else ("negative" if level >= 2 else "neutral"),
+        "confidence_score": confidence,
+        "verification_needed": confidence < 0.9,
+        "extracted_keywords": hazard_matches + urgency_matches + minor_matches,
+        "location_mentions": [],
+        "urgency_indicators": urgency_matches,
+        "risk_assessment": "Keyword-based assessment",
+        "recommended_actions": ["Monitor situation", "Verify with local authorities"]
+    }
+
+def ai_exact_cache_key(text: str, language: str = 'en', hazard_type: Optional[str] = None) -> str:
+    """Hash a report's (hazard_type, language, description) for the exact-match AI cache"""
+    key = f"{hazard_type or ''}|{language}|{text.strip().lower()}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+def invalidate_map_data_cache():
+    """Force the next map-data request to rebuild from the database"""
+    map_data_cache["expires"] = 0.0
+    map_data_cache["generation"] += 1
+
+def stats_key(value: Any) -> str:
+    """Make a field value safe to use as a counter key in the stats document"""
+    if value is None:
+        return "none"
+    return str(value).replace('.', '_').replace('$', '_')
+
+def stats_panic_index(panic_index: Optional[int]) -> int:
+    """Panic index as counted in panic_sum; reports without one count as 50"""
+    return 50 if panic_index is None else panic_index
+
+def report_stats_increments(report: Dict[str, Any], sign: int = 1) -> Dict[str, int]:
+    """Counter changes for adding (sign=1) or removing (sign=-1) a report"""
+    return {
+        "total": sign,
+        f"severity.{stats_key(report.get('severity'))}": sign,
+        f"verification.{stats_key(report.get('verification_status'))}": sign,
+        f"source.{stats_key(report.get('source'))}": sign,
+        f"language.{stats_key(report.get('language'))}": sign,
+        "panic_sum": sign * stats_panic_index(report.get("panic_index"))
+    }
+
+def merge_stats_increments(*increments: Dict[str, int]) -> Dict[str, int]:
+    """Sum counter changes, dropping those that cancel out"""
+    merged = defaultdict(int)
+    for increment in increments:
+        for key, value in increment.items():
+            merged[key] += value
+    return {key: value for key, value in merged.items() if value}
+
+async def update_report_stats(increments: Dict[str, int]):
+    """Atomically apply counter changes to the dashboard stats document"""
+    if increments:
+        await db.report_stats.update_one({"_id": REPORT_STATS_ID}, {"$inc": increments}, upsert=True)
+
+async def insert_report(report: HazardReport, degraded: bool = False):
+    """Store a new report and count it in the dashboard stats"""
+    report_dict = report_to_mongo(report)
+    if report.severity is None:
+        report_dict["classification_status"] = CLASSIFICATION_PENDING
+    elif degraded:
+        report_dict["classification_status"] = CLASSIFICATION_DEGRADED
+    try:
+        await db.reports.insert_one(report_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Report {report.id} already exists")
+    await update_report_stats(report_stats_increments(report_dict))
+
+def normalize_ai_cache_key(text: str, hazard_type: Optional[str] = None) -> str:
+    """Normalize a (hazard_type, description) pair into an AI cache key"""
+    return re.sub(r'\s+', ' ', f"{hazard_type or ''}:{text}").strip().lower()
+
+async def load_embedding_model():
+    """Load the sentence embedding model once; on failure the semantic cache stays disabled"""
+    global _embedding_model
+    try:
+        # Optional dependency (pulls in torch); imported here so the app runs without it
+        from sentence_transformers import SentenceTransformer
+        _embedding_model = await asyncio.to_thread(SentenceTransformer, EMBEDDING_MODEL_NAME)
     except Exception as e:
-        print(f"AI analysis error: {e}")
+        print(f"Embedding model unavailable, semantic AI cache disabled: {e}")
+
+async def embed_text(text: str) -> np.ndarray:
+    """Compute a unit-length sentence embedding without blocking the event loop"""
+    def _encode():
+        return _embedding_model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    return await asyncio.to_thread(_encode)
+
+def _add_to_ai_cache_index(index: Dict[str, Dict[str, Any]], key: str, language: str,
+                           embedding: np.ndarray, result: Dict[str, Any]):
+    """Insert or replace an entry in the in-process semantic cache index
+
+    Embeddings are rows of a preallocated matrix that grows by doubling, so adding an
+    entry writes one row; once AI_CACHE_MAX_ENTRIES is reached the oldest slot is reused.
+    """
+    bucket = index.get(language)
+    if bucket is None:
+        bucket = index[language] = {
+            "keys": {}, "slot_keys": [], "results": [], "next": 0,
+            "matrix": np.empty((16, len(embedding)), dtype=np.float32)
+        }
+    
+    slot = bucket["keys"].get(key)
+    if slot is not None:
+        bucket["results"][slot] = result
+    elif len(bucket["results"]) < AI_CACHE_MAX_ENTRIES:
+        slot = len(bucket["results"])
+        if slot == len(bucket["matrix"]):
+            # Searches in flight keep reading the previous matrix
+            grown = np.empty((min(2 * slot, AI_CACHE_MAX_ENTRIES), bucket["matrix"].shape[1]), dtype=np.float32)
+            grown[:slot] = bucket["matrix"]
+            bucket["matrix"] = grown
+        bucket["slot_keys"].append(key)
+        bucket["results"].append(result)
+    else:
+        slot = bucket["next"]
+        bucket["next"] = (slot + 1) % AI_CACHE_MAX_ENTRIES
+        del bucket["keys"][bucket["slot_keys"][slot]]
+        bucket["slot_keys"][slot] = key
+        bucket["results"][slot] = result
+    bucket["keys"][key] = slot
+    bucket["matrix"][slot] = embedding
+
+async def get_ai_cache_index() -> Dict[str, Dict[str, Any]]:
+    """Load the semantic cache from MongoDB on first use"""
+    global _ai_cache_index, _ai_cache_lock
+    if _ai_cache_index is not None:
+        return _ai_cache_index
+
+    if _ai_cache_lock is None:
+        _ai_cache_lock = asyncio.Lock()
+    async with _ai_cache_lock:
+        if _ai_cache_index is None:
+            index = {}
+            # Newest entries per language, added oldest first so eviction order is preserved
+            entries = []
+            for language in await db.ai_cache.distinct("language"):
+                entries += await db.ai_cache.find({"language": language}, {"_id": 0}) \
+                    .sort("created_at", -1).limit(AI_CACHE_MAX_ENTRIES).to_list(length=None)
+            entries.sort(key=lambda entry: entry.get("created_at", ""))
+            for entry in entries:
+                try:
+                    # Entries cached before results were validated may be unusable
+                    result = validate_ai_analysis(entry["result"])
+                except json.JSONDecodeError:
+                    continue
+                _add_to_ai_cache_index(
+                    index,
+                    entry["key"],
+                    entry.get("language", "en"),
+                    np.asarray(entry["embedding"], dtype=np.float32),
+                    result
+                )
+            _ai_cache_index = index
+    return _ai_cache_index
+
+async def lookup_ai_cache(embedding: np.ndarray, language: str = 'en') -> Optional[Dict[str, Any]]:
+    """Return the cached analysis of the nearest prior report if it is similar enough"""
+    index = await get_ai_cache_index()
+    bucket = index.get(language)
+    if not bucket or not bucket["results"]:
+        return None
+
+    # Embeddings are unit length, so the dot product is the cosine similarity
+    matrix = bucket["matrix"][:len(bucket["results"])]
+    def _nearest():
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        return best, float(similarities[best])
+
+    best, similarity = await asyncio.to_thread(_nearest)
+    # The slot may have been reused while the search ran; check its current row
+    if similarity >= AI_CACHE_SIMILARITY_THRESHOLD and \
+            float(bucket["matrix"][best] @ embedding) >= AI_CACHE_SIMILARITY_THRESHOLD:
+        return dict(bucket["results"][best])
+    return None
+
+async def store_ai_cache(key: str, language: str, embedding: np.ndarray, result: Dict[str, Any]):
+    """Persist an AI analysis in the semantic cache"""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.ai_cache.replace_one(
+            {"key": key},
+            {
+                "key": key,
+                "language": language,
+                "embedding": embedding.tolist(),
+                "result": result,
+                "created_at": now.isoformat(),
+                # BSON date for the TTL index
+                "expires_at": now + timedelta(seconds=AI_CACHE_TTL)
+            },
+            upsert=True
+        )
+        index = await get_ai_cache_index()
+        _add_to_ai_cache_index(index, key, language, embedding, result)
+    except Exception as e:
+        print(f"AI cache store error: {e}")
+
+class _JsonScanner:
+    """Track JSON string state while scanning streamed text"""
+
+    def __init__(self):
+        self.buffer = ''
+        self.position = 0
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def _scan(self, chunk: str):
+        """Append a chunk and yield (index, char) for each new character outside JSON strings"""
+        self.buffer += chunk
+        while self.position < len(self.buffer):
+            index = self.position
+            char = self.buffer[index]
+            self.position += 1
+
+            # Quotes in any preamble (e.g. markdown fences) before the JSON are not strings
+            if self.started:
+                if self.in_string:
+                    if self.escaped:
+                        self.escaped = False
+                    elif char == '\\':
+                        self.escaped = True
+                    elif char == '"':
+                        self.in_string = False
+                    continue
+                if char == '"':
+                    self.in_string = True
+                    continue
+            yield index, char
+
+class JsonStreamParser(_JsonScanner):
+    """Incrementally parse a streamed JSON object, resolving once the required fields are present"""
+
+    def __init__(self, required_fields: Tuple[str, ...] = ()):
+        super().__init__()
+        self.required_fields = required_fields
+        self.start = None
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """Consume a chunk; return the decoded object once it is usable, else None"""
+        for index, char in self._scan(chunk):
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self.start = index
+                    self.depth = 1
+                continue
+
+            if char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    return json.loads(self.buffer[self.start:index + 1])
+            elif char == ',' and self.depth == 1 and self.required_fields:
+                # A top-level value just completed; close the object to see what we have so far
+                try:
+                    partial = json.loads(self.buffer[self.start:index] + '}')
+                except json.JSONDecodeError:
+                    continue
+                if all(field in partial for field in self.required_fields):
+                    return partial
+        return None
+
+    def finish(self) -> Dict[str, Any]:
+        """Parse whatever was received when the stream ended"""
+        if self.start is None:
+            raise json.JSONDecodeError("No JSON object in reply", self.buffer, 0)
+        return json.loads(self.buffer[self.start:])
+
+class JsonArrayStreamParser(_JsonScanner):
+    """Incrementally parse a streamed JSON array, returning each element object as it completes"""
+
+    def __init__(self):
+        super().__init__()
+        self.object_start = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk; return the element objects completed by it"""
+        objects = []
+        for index, char in self._scan(chunk):
+            if not self.started:
+                if char == '[':
+                    self.started = True
+                    self.depth = 1
+                continue
+
+            if char in '{[':
+                self.depth += 1
+                if self.depth == 2 and char == '{':
+                    self.object_start = index
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 1 and char == '}':
+                    try:
+                        objects.append(json.loads(self.buffer[self.object_start:index + 1]))
+                    except json.JSONDecodeError:
+                        pass
+        return objects
+
+async def iter_llm_reply(chat: LlmChat, user_message: UserMessage):
+    """Yield an LLM reply in chunks, streaming when the client supports it"""
+    send_message_stream = getattr(chat, 'send_message_stream', None)
+    if send_message_stream is None:
+        yield await chat.send_message(user_message)
+        return
+
+    stream = send_message_stream(user_message)
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        # Cancel the remaining generation once the consumer stops reading
+        aclose = getattr(stream, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+
+async def stream_llm_json(chat: LlmChat, user_message: UserMessage,
+                          required_fields: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """Stream an LLM reply and return its JSON object as soon as the required fields are decoded"""
+    parser = JsonStreamParser(required_fields)
+    reply = iter_llm_reply(chat, user_message)
+    try:
+        async for chunk in reply:
+            result = parser.feed(chunk)
+            if result is not None:
+                return result
+    finally:
+        await reply.aclose()
+    return parser.finish()
+
+def create_analysis_chat(system_message: str) -> LlmChat:
+    """Create an LLM chat session for hazard analysis"""
+    return LlmChat(
+        api_key=EMERGENT_LLM_KEY,
+        session_id=f"analysis-{uuid.uuid4()}",
+        system_message=system_message
+    ).with_model("openai", "gpt-4o-mini")
+
+def validate_ai_analysis(result: Any) -> Dict[str, Any]:
+    """Validate and coerce an LLM analysis (e.g. "75" -> 75), filling optional defaults
+
+    An object with missing or invalid fields is as unusable as malformed JSON, so it
+    raises JSONDecodeError and takes the malformed-reply fallback.
+    """
+    try:
+        return AIAnalysis.model_validate(result).model_dump()
+    except ValidationError as e:
+        raise json.JSONDecodeError(f"Invalid AI analysis: {e}", json.dumps(result), 0)
+
+async def request_ai_analysis(text: str, language: str = 'en') -> Dict[str, Any]:
+    """Analyze a single report with the LLM"""
+    system_message = f"""You are an advanced ocean hazard analyst with multilingual capabilities. 
+    Analyze the given text and provide comprehensive analysis in JSON format.
+    
+    Text Language: {language}
+    
+    Provide analysis in this exact JSON structure:
+    {AI_ANALYSIS_STRUCTURE}"""
+
+    chat = create_analysis_chat(system_message)
+    user_message = UserMessage(text=f"Analyze this ocean hazard report: {text}")
+    result = await stream_llm_json(chat, user_message, AI_REQUIRED_FIELDS)
+    return validate_ai_analysis(result)
+
+async def request_ai_analysis_batch(batch: List[Tuple[str, str, asyncio.Future]]):
+    """Analyze several reports with one LLM call, resolving each future as its result streams in"""
+    system_message = f"""You are an advanced ocean hazard analyst with multilingual capabilities. 
+    You will receive a JSON array of ocean hazard reports, each with an "index", its text "language" and the "text".
+    Analyze every report and reply with a JSON array holding one analysis object per report.
+    
+    Each object must use this exact JSON structure, preceded by the report's "index":
+    {AI_ANALYSIS_STRUCTURE}"""
+
+    chat = create_analysis_chat(system_message)
+    if getattr(chat, 'send_message_stream', None) is None:
+        # Without streaming the whole array arrives at once, so a batch would need the budget
+        # of all its reports before anything resolves; send each report on its own instead
+        await asyncio.gather(*(resolve_ai_analysis(text, language, future) for text, language, future in batch))
+        return
+
+    reports = [{"index": index, "language": language, "text": text} for index, (text, language, _) in enumerate(batch)]
+    user_message = UserMessage(text=f"Analyze these ocean hazard reports: {json.dumps(reports, ensure_ascii=False)}")
+
+    parser = JsonArrayStreamParser()
+    remaining = len(batch)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + AI_REQUEST_TIMEOUT
+    reply = iter_llm_reply(chat, user_message)
+    try:
+        while remaining:
+            try:
+                chunk = await asyncio.wait_for(reply.__anext__(), timeout=deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            for result in parser.feed(chunk):
+                index = result.pop("index", None)
+                if not isinstance(index, int) or not 0 <= index < len(batch):
+                    continue
+                future = batch[index][2]
+                if future.done():
+                    continue
+                try:
+                    analysis = validate_ai_analysis(result)
+                except json.JSONDecodeError:
+                    continue
+                future.set_result(analysis)
+                remaining -= 1
+                deadline = loop.time() + AI_BATCH_ITEM_TIMEOUT
+    except Exception as e:
+        if remaining == len(batch):
+            # Nothing came back: the provider failed the whole batch
+            if isinstance(e, asyncio.TimeoutError):
+                e = asyncio.TimeoutError(f"LLM did not respond within {AI_REQUEST_TIMEOUT}s")
+            raise e
+        # The reply stalled or broke after some objects; retry the rest below
+        print(f"AI batch reply interrupted after {len(batch) - remaining} of {len(batch)} results: {e!r}")
+    finally:
+        await reply.aclose()
+
+    # Reports the batched reply skipped or mangled are retried on their own, each with its own budget
+    await asyncio.gather(*(
+        resolve_ai_analysis(text, language, future)
+        for text, language, future in batch if not future.done()
+    ))
+
+async def resolve_ai_analysis(text: str, language: str, future: asyncio.Future):
+    """Run a single LLM analysis within AI_REQUEST_TIMEOUT and settle its future"""
+    try:
+        result = await asyncio.wait_for(request_ai_analysis(text, language), timeout=AI_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError(f"LLM did not respond within {AI_REQUEST_TIMEOUT}s"))
+        return
+    except Exception as e:
+        if not future.done():
+            future.set_exception(e)
+        return
+    if not future.done():
+        future.set_result(result)
+
+def ai_circuit_open() -> bool:
+    """Whether LLM calls are currently short-circuited"""
+    return time.monotonic() < ai_circuit_breaker["open_until"]
+
+def record_ai_outcome(success: bool):
+    """Track consecutive LLM failures and open the circuit breaker past the threshold"""
+    if success:
+        ai_circuit_breaker["failures"] = 0
+        return
+    ai_circuit_breaker["failures"] += 1
+    if ai_circuit_breaker["failures"] >= AI_BREAKER_FAILURE_THRESHOLD:
+        ai_circuit_breaker["open_until"] = time.monotonic() + AI_BREAKER_OPEN_SECONDS
+
+async def process_ai_batch(batch: List[Tuple[str, str, asyncio.Future]]):
+    """Send one micro-batch of AI analysis requests"""
+    try:
+        if len(batch) == 1:
+            text, language, future = batch[0]
+            await resolve_ai_analysis(text, language, future)
+        else:
+            await request_ai_analysis_batch(batch)
+    except Exception as e:
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+
+    # The provider is healthy if it answered at all: any result, or a reply that was
+    # merely malformed, counts as success; only a batch with no answer is a failure
+    answered = any(
+        future.done() and not future.cancelled()
+        and (future.exception() is None or isinstance(future.exception(), json.JSONDecodeError))
+        for _, _, future in batch
+    )
+    record_ai_outcome(answered)
+
+async def run_ai_batch_worker():
+    """Collect concurrent AI analysis requests into micro-batches"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _ai_batch_queue.get()]
+        deadline = loop.time() + AI_BATCH_WINDOW
+        while len(batch) < AI_BATCH_MAX_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_ai_batch_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Keep collecting the next batch while this one is in flight
+        task = asyncio.create_task(process_ai_batch(batch))
+        _ai_batch_tasks.add(task)
+        task.add_done_callback(_ai_batch_tasks.discard)
+
+async def submit_ai_analysis(text: str, language: str = 'en') -> Dict[str, Any]:
+    """Queue a report for batched LLM analysis and wait for its result"""
+    global _ai_batch_queue, _ai_batch_worker
+    if _ai_batch_queue is None:
+        _ai_batch_queue = asyncio.Queue()
+    if _ai_batch_worker is None or _ai_batch_worker.done():
+        _ai_batch_worker = asyncio.create_task(run_ai_batch_worker())
+
+    future = asyncio.get_running_loop().create_future()
+    await _ai_batch_queue.put((text, language, future))
+    try:
+        # On timeout the future is cancelled, so the batch skips it when its result arrives
+        return await asyncio.wait_for(future, timeout=AI_CALLER_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise asyncio.TimeoutError(f"AI analysis did not finish within {AI_CALLER_TIMEOUT}s")
+
+def failed_ai_analysis() -> Dict[str, Any]:
+    """Fallback analysis when the LLM is unavailable; marked degraded so it is retried later"""
+    return {
+        "hazard_type": "Other",
+        "severity": "Medium",
+        "panic_index": 50,
+        "sentiment": "neutral", 
+        "confidence_score": 0.0,
+        "extracted_keywords": [],
+        "location_mentions": [],
+        "urgency_indicators": [],
+        "verification_needed": True,
+        "risk_assessment": "Analysis failed",
+        "recommended_actions": ["Manual review required"],
+        "degraded": True
+    }
+
+async def advanced_ai_analysis(text: str, language: str = 'en', hazard_type: Optional[str] = None) -> Dict[str, Any]:
+    """Enhanced AI analysis with multilingual support and sentiment analysis"""
+    exact_key = ai_exact_cache_key(text, language, hazard_type)
+    cached_result = ai_exact_cache.get(exact_key)
+    if cached_result is not None:
+        ai_routing_metrics["exact_cache"] += 1
+        return dict(cached_result)
+
+    # Clear-cut short reports are classified by keywords alone
+    heuristic_result = heuristic_ai_analysis(text, language, hazard_type)
+    if heuristic_result is not None:
+        ai_routing_metrics["heuristic"] += 1
+        return heuristic_result
+
+    # Semantic cache: similar descriptions of the same hazard reuse a prior analysis
+    cache_key = normalize_ai_cache_key(text, hazard_type)
+    embedding = None
+    if _embedding_model is not None and not HEURISTIC_NEGATION_PATTERN.search(text.lower()):
+        try:
+            embedding = await embed_text(cache_key)
+            cached_result = await lookup_ai_cache(embedding, language)
+            if cached_result:
+                ai_routing_metrics["semantic_cache"] += 1
+                ai_exact_cache[exact_key] = cached_result
+                return dict(cached_result)
+        except Exception as e:
+            print(f"AI cache lookup error: {e}")
+
+    if ai_circuit_open():
+        ai_routing_metrics["circuit_open"] += 1
+        return failed_ai_analysis()
+
+    ai_routing_metrics["llm"] += 1
+    try:
+        result = await submit_ai_analysis(text, language)
+    except json.JSONDecodeError:
+        # Fallback analysis
         return {
             "hazard_type": "Other",
-            "severity": "Medium",
+            "severity": "Medium", 
             "panic_index": 50,
-            "sentiment": "neutral", 
-            "confidence_score": 0.0,
+            "sentiment": "neutral",
+            "confidence_score": 0.5,
             "extracted_keywords": [],
             "location_mentions": [],
             "urgency_indicators": [],
             "verification_needed": True,
-            "risk_assessment": "Analysis failed",
-            "recommended_actions": ["Manual review required"]
+            "risk_assessment": "Analysis completed",
+            "recommended_actions": ["Monitor situation", "Verify with local authorities"]
         }
+    except Exception as e:
+        print(f"AI analysis error: {e}")
+        return failed_ai_analysis()
+
+    ai_exact_cache[exact_key] = result
+    if embedding is not None:
+        await store_ai_cache(cache_key, language, embedding, result)
+    return dict(result)
 
 async def detect_hazard_keywords(text: str, language: str = 'en') -> List[str]:
     """Detect hazard-related keywords in text"""
@@ -257,72 +1080,97 @@ async def generate_hotspots() -> List[Hotspot]:
         # Get reports from last 24 hours
         yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
         
-        reports_cursor = db.reports.find({"created_at": {"$gte": yesterday}})
+        reports_cursor = db.reports.find(
+            {"created_at": {"$gte": yesterday}},
+            {"_id": 0, "location.latitude": 1, "location.longitude": 1, "severity": 1, "hazard_type": 1}
+        )
         reports = await reports_cursor.to_list(length=None)
         
-        social_posts_cursor = db.social_media.find({"processed_at": {"$gte": yesterday}})
+        social_posts_cursor = db.social_media.find(
+            {"processed_at": {"$gte": yesterday}},
+            {"_id": 0, "location.latitude": 1, "location.longitude": 1}
+        )
         social_posts = await social_posts_cursor.to_list(length=None)
         
+        if not reports:
+            return []
+        
+        # Columnar (structure-of-arrays) view of the reports, snapped to 0.1 degree grid cells.
+        # Python's round() is used because np.round breaks ties differently (10.35 -> 10.4)
+        cell_lats = np.fromiter((round(r['location']['latitude'], 1) for r in reports), dtype=np.float64, count=len(reports))
+        cell_lngs = np.fromiter((round(r['location']['longitude'], 1) for r in reports), dtype=np.float64, count=len(reports))
+        severity_labels, severity_codes = np.unique(
+            np.array([r.get('severity') or 'Medium' for r in reports]), return_inverse=True
+        )
+        hazard_labels, hazard_codes = np.unique(
+            np.array([r.get('hazard_type') or 'Other' for r in reports]), return_inverse=True
+        )
+        
         # Group reports by geographic proximity (0.1 degree ~ 11km)
-        location_clusters = defaultdict(list)
+        cells, cell_codes, cell_counts = np.unique(
+            np.column_stack((cell_lats, cell_lngs)),
+            axis=0, return_inverse=True, return_counts=True
+        )
+        cell_codes = cell_codes.reshape(-1)
+        
+        # Per-cell severity and hazard type histograms
+        severity_counts = np.zeros((len(cells), len(severity_labels)), dtype=np.int64)
+        np.add.at(severity_counts, (cell_codes, severity_codes), 1)
+        hazard_counts = np.zeros((len(cells), len(hazard_labels)), dtype=np.int64)
+        np.add.at(hazard_counts, (cell_codes, hazard_codes), 1)
+        # First report index per cell and hazard type, so ties go to the earliest reported hazard
+        hazard_first_seen = np.full((len(cells), len(hazard_labels)), len(reports), dtype=np.int64)
+        np.minimum.at(hazard_first_seen, (cell_codes, hazard_codes), np.arange(len(reports)))
+        
+        hotspot_cells = np.flatnonzero(cell_counts >= 3)  # Minimum 3 reports for hotspot
+        if len(hotspot_cells) == 0:
+            return []
         
-        for report in reports:
-            lat = round(report['location']['latitude'], 1)
-            lng = round(report['location']['longitude'], 1) 
-            location_clusters[(lat, lng)].append(report)
+        # Social media posts within 0.1 degree of each hotspot center
+        located_posts = [p['location'] for p in social_posts if p.get('location')]
+        post_lats = np.array([location['latitude'] for location in located_posts], dtype=np.float64)
+        post_lngs = np.array([location['longitude'] for location in located_posts], dtype=np.float64)
+        center_lats = cells[hotspot_cells, 0]
+        center_lngs = cells[hotspot_cells, 1]
+        social_counts = (
+            (np.abs(post_lats[None, :] - center_lats[:, None]) <= 0.1) &
+            (np.abs(post_lngs[None, :] - center_lngs[:, None]) <= 0.1)
+        ).sum(axis=1)
         
-        # Add social media posts to clusters
-        for post in social_posts:
-            if post.get('location'):
-                lat = round(post['location']['latitude'], 1)
-                lng = round(post['location']['longitude'], 1)
-                if (lat, lng) not in location_clusters:
-                    location_clusters[(lat, lng)] = []
-                # Add to existing cluster data
+        # Risk level from the share of High/Critical reports
+        high_columns = np.isin(severity_labels, ['High', 'Critical'])
+        high_severity_counts = severity_counts[hotspot_cells][:, high_columns].sum(axis=1)
+        risk_ratios = high_severity_counts / cell_counts[hotspot_cells]
         
         hotspots = []
-        for (lat, lng), cluster_reports in location_clusters.items():
-            if len(cluster_reports) >= 3:  # Minimum 3 reports for hotspot
-                # Calculate metrics
-                severity_dist = defaultdict(int)
-                hazard_types = defaultdict(int)
-                
-                for report in cluster_reports:
-                    severity = report.get('severity', 'Medium')
-                    severity_dist[severity] += 1
-                    hazard_type = report.get('hazard_type', 'Other')
-                    hazard_types[hazard_type] += 1
-                
-                # Determine dominant hazard type
-                dominant_hazard = max(hazard_types.items(), key=lambda x: x[1])[0] if hazard_types else 'Other'
-                
-                # Calculate risk level
-                high_severity_count = severity_dist.get('High', 0) + severity_dist.get('Critical', 0)
-                total_reports = len(cluster_reports)
-                risk_ratio = high_severity_count / total_reports if total_reports > 0 else 0
-                
-                if risk_ratio >= 0.7:
-                    risk_level = 'critical'
-                elif risk_ratio >= 0.4:
-                    risk_level = 'high'
-                elif risk_ratio >= 0.2:
-                    risk_level = 'medium'
-                else:
-                    risk_level = 'low'
-                
-                hotspot = Hotspot(
-                    center_location=Location(latitude=lat, longitude=lng),
-                    radius_km=5.5,  # ~0.05 degrees
-                    report_count=len(cluster_reports),
-                    social_media_count=len([p for p in social_posts if p.get('location') and 
-                                          abs(p['location']['latitude'] - lat) <= 0.1 and 
-                                          abs(p['location']['longitude'] - lng) <= 0.1]),
-                    severity_distribution=dict(severity_dist),
-                    dominant_hazard_type=dominant_hazard,
-                    confidence_score=min(0.9, 0.3 + (total_reports * 0.1)),
-                    risk_level=risk_level
-                )
-                hotspots.append(hotspot)
+        for position, cell in enumerate(hotspot_cells):
+            risk_ratio = risk_ratios[position]
+            if risk_ratio >= 0.7:
+                risk_level = 'critical'
+            elif risk_ratio >= 0.4:
+                risk_level = 'high'
+            elif risk_ratio >= 0.2:
+                risk_level = 'medium'
+            else:
+                risk_level = 'low'
+            
+            total_reports = int(cell_counts[cell])
+            dominant_candidates = hazard_counts[cell] == hazard_counts[cell].max()
+            dominant_hazard = hazard_labels[np.argmin(np.where(dominant_candidates, hazard_first_seen[cell], len(reports)))]
+            hotspot = Hotspot(
+                center_location=Location(latitude=float(center_lats[position]), longitude=float(center_lngs[position])),
+                radius_km=5.5,  # ~0.05 degrees
+                report_count=total_reports,
+                social_media_count=int(social_counts[position]),
+                severity_distribution={
+                    str(label): int(count)
+                    for label, count in zip(severity_labels, severity_counts[cell]) if count > 0
+                },
+                dominant_hazard_type=str(dominant_hazard),
+                confidence_score=min(0.9, 0.3 + (total_reports * 0.1)),
+                risk_level=risk_level
+            )
+            hotspots.append(hotspot)
         
         return hotspots
     except Exception as e:
@@ -359,15 +1207,232 @@ async def process_social_media_mock(keywords: List[str], language: str = 'en') -
     
     return mock_posts
 
+async def save_report_classification(report_id: str, ai_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Persist the AI classification of an already stored report"""
+    classification = {
+        "severity": ai_result["severity"],
+        "panic_index": ai_result["panic_index"],
+        "ai_category": ai_result["hazard_type"],
+        "sentiment": ai_result["sentiment"]
+    }
+    # Derived before the write, so nothing can fail between the update and the counters
+    new_panic = stats_panic_index(classification["panic_index"])
+    update = {"$set": {
+        **classification,
+        "base_priority_score": base_priority_score(classification["severity"], classification["panic_index"])
+    }}
+    if ai_result.get("degraded"):
+        update["$set"]["classification_status"] = CLASSIFICATION_DEGRADED
+    else:
+        update["$unset"] = {"classification_status": ""}
+    previous = await db.reports.find_one_and_update(
+        {"id": report_id},
+        update,
+        projection={"_id": 0, "severity": 1, "panic_index": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is not None:
+        await update_report_stats(merge_stats_increments(
+            {f"severity.{stats_key(previous.get('severity'))}": -1, f"severity.{stats_key(classification['severity'])}": 1},
+            {"panic_sum": new_panic - stats_panic_index(previous.get("panic_index"))}
+        ))
+    invalidate_map_data_cache()
+    return classification
+
+async def classify_report(report_id: str, description: str, language: str = 'en',
+                          hazard_type: Optional[str] = None) -> Dict[str, Any]:
+    """Run AI analysis for a stored report and persist its classification"""
+    ai_result = await advanced_ai_analysis(description, language, hazard_type)
+    if ai_result.get("degraded"):
+        schedule_reclassification(report_id, description, language, hazard_type)
+    return await save_report_classification(report_id, ai_result)
+
+async def reclassify_report(report_id: str, description: str, language: str = 'en',
+                            hazard_type: Optional[str] = None):
+    """Retry AI analysis for a report that received the fallback classification"""
+    # Wait at least until the circuit breaker would let the LLM call through
+    await asyncio.sleep(max(AI_RETRY_DELAY, ai_circuit_breaker["open_until"] - time.monotonic()))
+    ai_result = await advanced_ai_analysis(description, language, hazard_type)
+    if ai_result.get("degraded"):
+        # Still stored, so a report that was never classified gets the fallback and stays marked degraded
+        print(f"AI reclassification failed for report {report_id}")
+    await save_report_classification(report_id, ai_result)
+
+def schedule_reclassification(report_id: str, description: str, language: str = 'en',
+                              hazard_type: Optional[str] = None):
+    """Retry a degraded classification in the background"""
+    task = asyncio.create_task(reclassify_report(report_id, description, language, hazard_type))
+    _reclassification_tasks.add(task)
+    task.add_done_callback(_reclassification_tasks.discard)
+
+async def insert_and_classify_report(report: HazardReport) -> HazardReport:
+    """Insert an unclassified report while its AI analysis runs, then store the result"""
+    ai_result, _ = await asyncio.gather(
+        advanced_ai_analysis(report.description, report.language, report.hazard_type),
+        insert_report(report)
+    )
+    if ai_result.get("degraded"):
+        schedule_reclassification(report.id, report.description, report.language, report.hazard_type)
+    classification = await save_report_classification(report.id, ai_result)
+    return report.model_copy(update=classification)
+
 # API Routes
 
+@app.on_event("startup")
+async def create_indexes():
+    """Ensure the indexes used by report queries exist"""
+    await ensure_report_id_index()
+    await db.reports.create_index("severity")
+    await db.reports.create_index("hazard_type")
+    await db.reports.create_index([("created_at", -1)])
+    await db.reports.create_index([("base_priority_score", -1)])
+    await db.reports.create_index("classification_status", sparse=True)
+    await ensure_ai_cache_index()
+    await backfill_priority_scores()
+    await backfill_inline_media()
+    if await db.report_stats.find_one({"_id": REPORT_STATS_ID}) is None:
+        await rebuild_report_stats()
+
+@app.on_event("startup")
+async def load_models():
+    """Load the embedding model before serving so no report waits for the download"""
+    await load_embedding_model()
+
+@app.on_event("startup")
+async def resume_classifications():
+    """Requeue classifications that were in flight or degraded when the server last stopped"""
+    cursor = db.reports.find(
+        # Rows inserted unclassified before classification_status existed have no severity
+        {"$or": [
+            {"classification_status": {"$in": [CLASSIFICATION_PENDING, CLASSIFICATION_DEGRADED]}},
+            {"severity": None}
+        ]},
+        {"_id": 0, "id": 1, "description": 1, "language": 1, "hazard_type": 1}
+    )
+    requeued = 0
+    async for report in cursor:
+        schedule_reclassification(report["id"], report["description"], report.get("language", "en"), report.get("hazard_type"))
+        requeued += 1
+    if requeued:
+        print(f"Requeued AI classification of {requeued} reports")
+
+async def duplicate_values(collection, field: str) -> List[Dict[str, Any]]:
+    """Values of a field held by more than one document, with the _ids holding each"""
+    cursor = await collection.aggregate([
+        {"$group": {"_id": f"${field}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    return await cursor.to_list(length=None)
+
+async def ensure_report_id_index():
+    """Make report ids unique, unless existing data already holds duplicate ids"""
+    indexes = await db.reports.index_information()
+    if indexes.get("id_1", {}).get("unique"):
+        return
+    
+    # Bulk sync stored client-supplied ids before the index existed
+    duplicates = await duplicate_values(db.reports, "id")
+    if duplicates:
+        sample = ", ".join(str(duplicate["_id"]) for duplicate in duplicates[:10])
+        print(f"WARNING: {len(duplicates)} report ids are shared by several reports ({sample}). "
+              "reports.id stays non-unique until they are resolved.")
+        await db.reports.create_index("id")
+        return
+    
+    if "id_1" in indexes:
+        await db.reports.drop_index("id_1")
+    await db.reports.create_index("id", unique=True)
+
+async def ensure_ai_cache_index():
+    """Index semantic cache entries by key and expire them, dropping duplicates left by concurrent upserts"""
+    try:
+        await db.ai_cache.create_index("key", unique=True)
+    except OperationFailure:
+        # Cache entries are disposable: keep one per key
+        for duplicate in await duplicate_values(db.ai_cache, "key"):
+            await db.ai_cache.delete_many({"_id": {"$in": duplicate["ids"][1:]}})
+        await db.ai_cache.create_index("key", unique=True)
+    await db.ai_cache.create_index([("language", 1), ("created_at", -1)])
+    
+    # Entries stored before expiry existed age out one TTL from now
+    await db.ai_cache.update_many(
+        {"expires_at": {"$exists": False}},
+        {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=AI_CACHE_TTL)}}
+    )
+    await db.ai_cache.create_index("expires_at", expireAfterSeconds=0)
+
+async def rebuild_report_stats() -> Dict[str, Any]:
+    """Recompute the dashboard stats document from the reports collection"""
+    stats_pipeline = [
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            **{
+                facet: [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+                for facet, field in zip(REPORT_STATS_FACETS, ("severity", "verification_status", "source", "language"))
+            },
+            "panic": [{"$group": {"_id": None, "sum": {"$sum": {"$ifNull": ["$panic_index", 50]}}}}]
+        }}
+    ]
+    stats_cursor = await db.reports.aggregate(stats_pipeline)
+    stats = (await stats_cursor.to_list(length=1))[0]
+    
+    stats_doc = {
+        "_id": REPORT_STATS_ID,
+        "total": stats["total"][0]["count"] if stats["total"] else 0,
+        "panic_sum": stats["panic"][0]["sum"] if stats["panic"] else 0
+    }
+    for facet in REPORT_STATS_FACETS:
+        stats_doc[facet] = {stats_key(result["_id"]): result["count"] for result in stats[facet]}
+    await db.report_stats.replace_one({"_id": REPORT_STATS_ID}, stats_doc, upsert=True)
+    return stats_doc
+
+async def backfill_priority_scores():
+    """Store base_priority_score on reports written before it existed"""
+    cursor = db.reports.find(
+        {"base_priority_score": {"$exists": False}},
+        {"_id": 1, "severity": 1, "panic_index": 1}
+    )
+    updates = [
+        UpdateOne(
+            {"_id": report["_id"]},
+            {"$set": {"base_priority_score": base_priority_score(report.get("severity"), report.get("panic_index"))}}
+        )
+        async for report in cursor
+    ]
+    if updates:
+        await db.reports.bulk_write(updates)
+
+async def backfill_inline_media():
+    """Move base64 media blobs of reports written before GridFS storage into GridFS"""
+    cursor = db.reports.find(
+        {"media_items": {"$elemMatch": {"base64_data": {"$type": "string", "$ne": ""}}}},
+        {"_id": 1, "id": 1, "media_items": 1}
+    )
+    migrated = 0
+    async for report in cursor:
+        media_items = []
+        for media_data in report["media_items"]:
+            media_item = MediaItem(**media_data)
+            try:
+                decoded = decode_inline_media(media_item)
+            except HTTPException:
+                print(f"Skipping undecodable media {media_item.filename or 'upload'} of report {report.get('id')}")
+                media_items.append(media_data)
+                continue
+            media_items.append((await offload_inline_media(media_item, decoded)).model_dump())
+        await db.reports.update_one({"_id": report["_id"]}, {"$set": {"media_items": media_items}})
+        migrated += 1
+    if migrated:
+        print(f"Moved inline media of {migrated} reports into GridFS")
+
 @app.get("/api/health")
 async def health_check():
     return {
         "status": "healthy", 
         "service": "Ocean Hazard Alert API v2.0",
         "features": ["social_media", "multilingual", "hotspots", "offline_sync"],
-        "supported_languages": list(SUPPORTED_LANGUAGES.keys())
+        "supported_languages": list(SUPPORTED_LANGUAGES.keys()),
+        "ai_routing": dict(ai_routing_metrics)
     }
 
 @app.post("/api/users/register")
@@ -383,7 +1448,7 @@ async def register_user(user_data: UserRegistration):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
-    user_dict = user_data.dict()
+    user_dict = user_data.model_dump()
     user_dict['id'] = str(uuid.uuid4())
     user_dict['created_at'] = datetime.now(timezone.utc).isoformat()
     user_dict['is_active'] = True
@@ -400,32 +1465,55 @@ async def register_user(user_data: UserRegistration):
 
 @app.post("/api/reports/bulk", response_model=List[HazardReport])
 async def create_bulk_reports(reports_data: List[Dict]):
-    """Handle bulk report creation (for offline sync)"""
-    created_reports = []
+    """Handle bulk report creation (for offline sync)
+
+    The whole batch is validated before anything is analyzed or stored, and reports
+    whose ids are already stored (a retried sync) are returned as stored.
+    """
+    try:
+        reports = [HazardReport(**report_data) for report_data in reports_data]
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    decoded_media = [[decode_inline_media(media_item) for media_item in report.media_items] for report in reports]
+    
+    stored_reports = {
+        stored["id"]: stored
+        async for stored in db.reports.find({"id": {"$in": [report.id for report in reports]}}, REPORT_LIST_PROJECTION)
+    }
     
-    for report_data in reports_data:
+    created_reports = []
+    for report, report_media in zip(reports, decoded_media):
+        if report.id in stored_reports:
+            created_reports.append(stored_reports[report.id])
+            continue
+        
         # Enhanced AI analysis
-        ai_result = await advanced_ai_analysis(
-            report_data.get('description', ''), 
-            report_data.get('language', 'en')
-        )
+        ai_result = await advanced_ai_analysis(report.description, report.language, report.hazard_type)
         
         # Create report with AI analysis
-        report = HazardReport(**report_data)
         report.severity = ai_result["severity"]
         report.panic_index = ai_result["panic_index"] 
         report.ai_category = ai_result["hazard_type"]
         report.sentiment = ai_result["sentiment"]
         report.verification_status = "verification_needed" if ai_result["verification_needed"] else "pending"
+        report.media_items = [
+            await offload_inline_media(media_item, decoded)
+            for media_item, decoded in zip(report.media_items, report_media)
+        ]
         
         # Save to database
-        report_dict = report.dict()
-        report_dict = prepare_for_mongo(report_dict)
-        await db.reports.insert_one(report_dict)
+        await insert_report(report, degraded=ai_result.get("degraded", False))
+        if ai_result.get("degraded"):
+            schedule_reclassification(report.id, report.description, report.language, report.hazard_type)
         
-        created_reports.append(report)
+        report_dict = report.model_dump()
+        # A client id repeated within the batch is stored once
+        stored_reports[report.id] = report_dict
+        created_reports.append(report_dict)
     
-    return created_reports
+    invalidate_map_data_cache()
+    # Reports were validated on construction; skip the response_model pass
+    return ORJSONResponse(created_reports)
 
 @app.post("/api/reports/advanced", response_model=HazardReport)
 async def create_advanced_report(
@@ -442,18 +1530,12 @@ async def create_advanced_report(
 ):
     """Create enhanced hazard report with multiple media files"""
     
-    # Process media files
-    media_items = []
+    # Process media files, rejecting the request before anything is stored
+    media_files = [media_file for media_file in media_files if media_file.filename]
     for media_file in media_files:
-        if media_file.filename:
-            content = await media_file.read()
-            media_item = MediaItem(
-                type=media_file.content_type.split('/')[0] if media_file.content_type else 'unknown',
-                base64_data=base64.b64encode(content).decode('utf-8'),
-                filename=media_file.filename,
-                size=len(content)
-            )
-            media_items.append(media_item)
+        if not is_allowed_media_type(media_file.content_type):
+            raise HTTPException(status_code=415, detail=f"Unsupported media type: {media_file.content_type}")
+    media_items = [await store_media(media_file) for media_file in media_files]
     
     # Create location
     location = Location(
@@ -463,9 +1545,6 @@ async def create_advanced_report(
         country=country
     )
     
-    # Enhanced AI analysis with multilingual support
-    ai_result = await advanced_ai_analysis(description, language)
-    
     # Create report
     report = HazardReport(
         name=name,
@@ -475,19 +1554,12 @@ async def create_advanced_report(
         media_items=media_items,
         language=language,
         offline_created=offline_created,
-        sync_status='synced' if not offline_created else 'pending_sync',
-        severity=ai_result["severity"],
-        panic_index=ai_result["panic_index"],
-        ai_category=ai_result["hazard_type"],
-        sentiment=ai_result["sentiment"]
+        sync_status='synced' if not offline_created else 'pending_sync'
     )
     
-    # Save to database
-    report_dict = report.dict()
-    report_dict = prepare_for_mongo(report_dict)
-    await db.reports.insert_one(report_dict)
-    
-    return report
+    # Save to database while the multilingual AI analysis runs
+    report = await insert_and_classify_report(report)
+    return ORJSONResponse(report.model_dump())
 
 @app.get("/api/reports/advanced", response_model=List[HazardReport])
 async def get_advanced_reports(
@@ -510,8 +1582,9 @@ async def get_advanced_reports(
     if verification_status != 'all':
         filter_criteria['verification_status'] = verification_status
     
-    reports = await db.reports.find(filter_criteria).sort("created_at", -1).skip(offset).limit(limit).to_list(length=None)
-    return [HazardReport(**report) for report in reports]
+    reports = await db.reports.find(filter_criteria, REPORT_LIST_PROJECTION).sort("created_at", -1).skip(offset).limit(limit).to_list(length=None)
+    # Stored rows are already clean; skip re-validating them through HazardReport
+    return ORJSONResponse(reports)
 
 @app.get("/api/social-media/process")
 async def process_social_media(keywords: str = Query("tsunami,cyclone,flood")):
@@ -537,12 +1610,13 @@ async def process_social_media(keywords: str = Query("tsunami,cyclone,flood")):
         )
         
         # Save to database
-        post_dict = social_post.dict()
+        post_dict = social_post.model_dump()
         post_dict = prepare_for_mongo(post_dict)
         await db.social_media.insert_one(post_dict)
         
         processed_posts.append(social_post)
     
+    invalidate_map_data_cache()
     return {
         "processed_count": len(processed_posts),
         "posts": processed_posts,
@@ -552,22 +1626,20 @@ async def process_social_media(keywords: str = Query("tsunami,cyclone,flood")):
 @app.get("/api/hotspots", response_model=List[Hotspot])
 async def get_dynamic_hotspots():
     """Get dynamically generated hotspots"""
-    hotspots = await generate_hotspots()
+    hotspots = [hotspot.model_dump() for hotspot in await generate_hotspots()]
     
     # Save hotspots to database
-    for hotspot in hotspots:
-        hotspot_dict = hotspot.dict()
-        hotspot_dict = prepare_for_mongo(hotspot_dict)
-        
+    for hotspot_dict in hotspots:
         # Update existing or create new
         await db.hotspots.replace_one(
-            {"center_location.latitude": hotspot.center_location.latitude,
-             "center_location.longitude": hotspot.center_location.longitude},
-            hotspot_dict,
+            {"center_location.latitude": hotspot_dict["center_location"]["latitude"],
+             "center_location.longitude": hotspot_dict["center_location"]["longitude"]},
+            prepare_for_mongo(dict(hotspot_dict)),
             upsert=True
         )
     
-    return hotspots
+    invalidate_map_data_cache()
+    return ORJSONResponse(hotspots)
 
 @app.get("/api/analytics/advanced", response_model=AnalyticsData)
 async def get_advanced_analytics():
@@ -600,24 +1672,31 @@ async def get_advanced_analytics():
         {"$match": {"created_at": {"$gte": week_ago}}},
         {"$group": {"_id": "$sentiment", "count": {"$sum": 1}}}
     ]
-    sentiment_results = await db.reports.aggregate(sentiment_pipeline).to_list(length=None)
-    sentiment_distribution = {result["_id"]: result["count"] for result in sentiment_results}
+    sentiment_cursor = await db.reports.aggregate(sentiment_pipeline)
+    sentiment_results = await sentiment_cursor.to_list(length=None)
+    # Reports still being classified have no sentiment yet
+    sentiment_distribution = {
+        result["_id"] if result["_id"] is not None else CLASSIFICATION_PENDING: result["count"]
+        for result in sentiment_results
+    }
     
     # Language distribution
     language_pipeline = [
         {"$match": {"created_at": {"$gte": week_ago}}},
         {"$group": {"_id": "$language", "count": {"$sum": 1}}}
     ]
-    language_results = await db.reports.aggregate(language_pipeline).to_list(length=None)
-    language_distribution = {result["_id"]: result["count"] for result in language_results}
+    language_cursor = await db.reports.aggregate(language_pipeline)
+    language_results = await language_cursor.to_list(length=None)
+    language_distribution = {stats_key(result["_id"]): result["count"] for result in language_results}
     
     # Source distribution
     source_pipeline = [
         {"$match": {"created_at": {"$gte": week_ago}}},
         {"$group": {"_id": "$source", "count": {"$sum": 1}}}
     ]
-    source_results = await db.reports.aggregate(source_pipeline).to_list(length=None)
-    source_distribution = {result["_id"]: result["count"] for result in source_results}
+    source_cursor = await db.reports.aggregate(source_pipeline)
+    source_results = await source_cursor.to_list(length=None)
+    source_distribution = {stats_key(result["_id"]): result["count"] for result in source_results}
     
     # Generate trend data (daily counts for last 7 days)
     trend_data = []
@@ -638,7 +1717,7 @@ async def get_advanced_analytics():
             "social_media": day_social
         })
     
-    return AnalyticsData(
+    analytics = AnalyticsData(
         total_reports=total_reports,
         social_media_posts=social_media_posts,
         active_hotspots=active_hotspots,
@@ -648,17 +1727,36 @@ async def get_advanced_analytics():
         source_distribution=source_distribution,
         trend_data=list(reversed(trend_data))
     )
+    return ORJSONResponse(analytics.model_dump())
 
 @app.get("/api/reports/map-data")
 async def get_map_visualization_data():
-    """Get enhanced data for map visualization"""
+    """Get enhanced data for map visualization, served from a short-TTL cache"""
+    global _map_data_lock
+    if map_data_cache["content"] is None or time.monotonic() >= map_data_cache["expires"]:
+        if _map_data_lock is None:
+            _map_data_lock = asyncio.Lock()
+        async with _map_data_lock:
+            # Another request may have rebuilt the cache while we waited
+            if map_data_cache["content"] is None or time.monotonic() >= map_data_cache["expires"]:
+                generation = map_data_cache["generation"]
+                content = orjson.dumps(await build_map_visualization_data())
+                # Skip caching if a write invalidated the data mid-build
+                if generation == map_data_cache["generation"]:
+                    map_data_cache["content"] = content
+                    map_data_cache["expires"] = time.monotonic() + MAP_DATA_CACHE_TTL
+                return Response(content=content, media_type="application/json")
+    return Response(content=map_data_cache["content"], media_type="application/json")
+
+async def build_map_visualization_data() -> Dict[str, Any]:
+    """Build map markers, social media markers and hotspot areas from the last 24 hours"""
     
     # Get all reports from last 24 hours
     yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
     
-    reports = await db.reports.find({"created_at": {"$gte": yesterday}}).to_list(length=None)
-    social_posts = await db.social_media.find({"processed_at": {"$gte": yesterday}}).to_list(length=None)
-    hotspots = await db.hotspots.find({"last_updated": {"$gte": yesterday}}).to_list(length=None)
+    reports = await db.reports.find({"created_at": {"$gte": yesterday}}, REPORT_MAP_PROJECTION).to_list(length=None)
+    social_posts = await db.social_media.find({"processed_at": {"$gte": yesterday}}, SOCIAL_MAP_PROJECTION).to_list(length=None)
+    hotspots = await db.hotspots.find({"last_updated": {"$gte": yesterday}}, HOTSPOT_MAP_PROJECTION).to_list(length=None)
     
     # Prepare map markers
     report_markers = []
@@ -728,6 +1826,29 @@ async def get_map_visualization_data():
         }
     }
 
+@app.get("/api/media/{file_id}")
+async def get_media(file_id: str):
+    """Stream an uploaded media file from GridFS"""
+    try:
+        grid_out = await media_bucket.open_download_stream(ObjectId(file_id))
+    except (InvalidId, NoFile):
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    async def iter_chunks():
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+    
+    content_type = (grid_out.metadata or {}).get("content_type")
+    headers = {"X-Content-Type-Options": "nosniff"}
+    if not is_allowed_media_type(content_type):
+        # Files stored before uploads were restricted (or without a type) are downloaded, never rendered
+        content_type = "application/octet-stream"
+        headers["Content-Disposition"] = "attachment"
+    return StreamingResponse(iter_chunks(), media_type=content_type, headers=headers)
+
 @app.get("/api/translations/{language}")
 async def get_translations(language: str):
     """Get UI translations for specified language"""
@@ -739,17 +1860,25 @@ async def verify_report(report_id: str, verification_status: str = Query(...)):
     if verification_status not in ["verified", "false_positive", "investigating", "pending"]:
         raise HTTPException(status_code=400, detail="Invalid verification status")
     
-    result = await db.reports.update_one(
+    previous = await db.reports.find_one_and_update(
         {"id": report_id},
         {"$set": {
             "verification_status": verification_status,
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
+        }},
+        projection={"_id": 0, "verification_status": 1},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
+    await update_report_stats(merge_stats_increments(
+        {f"verification.{stats_key(previous.get('verification_status'))}": -1},
+        {f"verification.{stats_key(verification_status)}": 1}
+    ))
+    
+    invalidate_map_data_cache()
     return {"message": "Report verification status updated", "status": verification_status}
 
 # Keep existing endpoints for backward compatibility
@@ -761,114 +1890,145 @@ async def create_report(
     address: str = Form(""),
     hazard_type: str = Form(...),
     description: str = Form(...),
-    media: Optional[UploadFile] = File(None)
+    media: Optional[UploadFile] = File(None),
+    async_classification: bool = Query(False)
 ):
-    """Legacy endpoint for simple report creation"""
+    """Legacy endpoint for simple report creation.
+
+    With async_classification=true the report is stored unclassified and returned
+    immediately (202); follow GET /api/reports/{id}/classification for the result.
+    """
     media_items = []
     if media:
-        content = await media.read()
-        media_item = MediaItem(
-            type=media.content_type.split('/')[0] if media.content_type else 'unknown',
-            base64_data=base64.b64encode(content).decode('utf-8'),
-            filename=media.filename
-        )
-        media_items.append(media_item)
+        media_items.append(await store_media(media))
     
     location = Location(latitude=latitude, longitude=longitude, address=address)
     
-    ai_result = await advanced_ai_analysis(description)
-    
     report = HazardReport(
         name=name,
-        location=location, 
+        location=location,
         hazard_type=hazard_type,
         description=description,
-        media_items=media_items,
-        severity=ai_result["severity"],
-        panic_index=ai_result["panic_index"],
-        ai_category=ai_result["hazard_type"],
-        sentiment=ai_result["sentiment"]
+        media_items=media_items
     )
     
-    report_dict = report.dict()
-    report_dict = prepare_for_mongo(report_dict)
-    await db.reports.insert_one(report_dict)
+    if async_classification:
+        await insert_report(report)
+        invalidate_map_data_cache()
+        
+        report_id = report.id
+        task = asyncio.create_task(classify_report(report_id, description, hazard_type=hazard_type))
+        pending_classifications[report_id] = task
+        task.add_done_callback(lambda _: pending_classifications.pop(report_id, None))
+        
+        return ORJSONResponse(report.model_dump(), status_code=202)
     
-    return report
+    report = await insert_and_classify_report(report)
+    return ORJSONResponse(report.model_dump())
 
 @app.get("/api/reports", response_model=List[HazardReport])
 async def get_reports():
     """Legacy endpoint for getting reports"""
-    reports = await db.reports.find().sort("created_at", -1).to_list(length=None)
-    return [HazardReport(**report) for report in reports]
+    reports = await db.reports.find({}, REPORT_LIST_PROJECTION).sort("created_at", -1).to_list(length=None)
+    # Stored rows are already clean; skip re-validating them through HazardReport
+    return ORJSONResponse(reports)
+
+@app.get("/api/reports/{report_id}/classification")
+async def stream_report_classification(report_id: str):
+    """Stream a report's AI classification as a server-sent event once it is available"""
+    classification_fields = {"_id": 0, "severity": 1, "panic_index": 1, "ai_category": 1, "sentiment": 1}
+    report = await db.reports.find_one({"id": report_id}, classification_fields)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    async def event_stream():
+        classification = report
+        deadline = asyncio.get_running_loop().time() + CLASSIFICATION_STREAM_TIMEOUT
+        while classification.get("severity") is None:
+            task = pending_classifications.get(report_id)
+            if task is not None:
+                # Shield so a client disconnect does not cancel the classification itself
+                classification = await asyncio.shield(task)
+                break
+            if asyncio.get_running_loop().time() >= deadline:
+                yield "event: pending\ndata: {}\n\n"
+                return
+            # Classification may be running in another worker; poll the database
+            yield ": pending\n\n"
+            await asyncio.sleep(CLASSIFICATION_POLL_INTERVAL)
+            classification = await db.reports.find_one({"id": report_id}, classification_fields) or {}
+        
+        yield f"event: classification\ndata: {json.dumps(classification)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/api/reports/priority")
 async def get_priority_reports():
     """Enhanced priority reports with social media integration"""
-    reports = await db.reports.find().to_list(length=None)
+    # Base score of the Nth best report; nothing more than PRIORITY_DYNAMIC_RANGE
+    # below it can overtake the top N once verification and recency are added
+    cutoff = await db.reports.find({}, {"_id": 0, "base_priority_score": 1}) \
+        .sort("base_priority_score", -1).skip(PRIORITY_REPORT_LIMIT - 1).limit(1).to_list(length=1)
+    
+    candidate_filter = {}
+    if cutoff and "base_priority_score" in cutoff[0]:
+        candidate_filter = {"base_priority_score": {"$gte": cutoff[0]["base_priority_score"] - PRIORITY_DYNAMIC_RANGE}}
+    reports = await db.reports.find(candidate_filter, {"_id": 0, "media_items.base64_data": 0, "classification_status": 0}).to_list(length=None)
     
     priority_reports = []
-    for report_dict in reports:
-        report = HazardReport(**report_dict)
-        
-        # Enhanced priority scoring
-        severity_weights = {"Low": 1, "Medium": 2, "High": 3, "Critical": 4}
-        severity_score = severity_weights.get(report.severity, 2)
-        
-        panic_score = (report.panic_index or 50) / 100
-        
-        # Add verification and recency factors
-        verification_bonus = 0.2 if report.verification_status == "verified" else 0
-        
-        # Time decay (newer reports get higher priority)
-        hours_old = (datetime.now(timezone.utc) - datetime.fromisoformat(report.created_at.replace('Z', '+00:00'))).total_seconds() / 3600
-        time_factor = max(0.1, 1 - (hours_old / 48))  # Decay over 48 hours
-        
-        priority_score = (severity_score * 0.4) + (panic_score * 0.3) + (verification_bonus * 0.1) + (time_factor * 0.2)
+    for report in reports:
+        base_score = report.pop("base_priority_score", None)
+        if base_score is None:
+            base_score = base_priority_score(report.get("severity"), report.get("panic_index"))
         
         priority_reports.append({
             "report": report,
-            "priority_score": priority_score
+            "priority_score": priority_score(report, base_score)
         })
     
     # Sort by priority score
     priority_reports.sort(key=lambda x: x["priority_score"], reverse=True)
     
-    return priority_reports[:15]  # Top 15 priority reports
+    return ORJSONResponse(priority_reports[:PRIORITY_REPORT_LIMIT])
 
 @app.get("/api/dashboard/stats")
 async def get_dashboard_stats():
     """Enhanced dashboard statistics"""
-    total_reports = await db.reports.count_documents({})
-    total_social_posts = await db.social_media.count_documents({})
+    # Counters are maintained on write, so this is a single document read
+    stats, total_social_posts, active_hotspots = await asyncio.gather(
+        db.report_stats.find_one({"_id": REPORT_STATS_ID}),
+        db.social_media.count_documents({}),
+        db.hotspots.count_documents({"risk_level": {"$in": ["medium", "high", "critical"]}})
+    )
+    if stats is None:
+        stats = await rebuild_report_stats()
+    
+    total_reports = stats.get("total", 0)
     
     # Count by severity
-    high_severity = await db.reports.count_documents({"severity": {"$in": ["High", "Critical"]}})
-    medium_severity = await db.reports.count_documents({"severity": "Medium"})
-    low_severity = await db.reports.count_documents({"severity": "Low"})
+    severity_counts = stats.get("severity", {})
+    high_severity = severity_counts.get("High", 0) + severity_counts.get("Critical", 0)
+    medium_severity = severity_counts.get("Medium", 0)
+    low_severity = severity_counts.get("Low", 0)
     
     # Count by verification status
-    verified_reports = await db.reports.count_documents({"verification_status": "verified"})
-    pending_verification = await db.reports.count_documents({"verification_status": "pending"})
+    verification_counts = stats.get("verification", {})
+    verified_reports = verification_counts.get("verified", 0)
+    pending_verification = verification_counts.get("pending", 0)
     
     # Count by source
-    citizen_reports = await db.reports.count_documents({"source": "citizen_report"})
-    social_reports = await db.reports.count_documents({"source": "social_media"})
-    
-    # Active hotspots
-    active_hotspots = await db.hotspots.count_documents({"risk_level": {"$in": ["medium", "high", "critical"]}})
+    source_counts = stats.get("source", {})
+    citizen_reports = source_counts.get("citizen_report", 0)
+    social_reports = source_counts.get("social_media", 0)
     
     # Language distribution
-    language_counts = {}
-    for lang_code in SUPPORTED_LANGUAGES:
-        count = await db.reports.count_documents({"language": lang_code})
-        if count > 0:
-            language_counts[lang_code] = count
-    
-    # Calculate average panic index
-    reports = await db.reports.find().to_list(length=None)
-    total_panic = sum(report.get("panic_index", 50) for report in reports)
-    avg_panic = total_panic / total_reports if total_reports > 0 else 0
+    language_counts = {
+        lang_code: count for lang_code, count in stats.get("language", {}).items()
+        if lang_code in SUPPORTED_LANGUAGES
+    }
+    
+    # Average panic index
+    avg_panic = stats.get("panic_sum", 0) / total_reports if total_reports > 0 else 0
     
     return {
         "total_reports": total_reports,
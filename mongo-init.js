@@ -10,6 +10,7 @@ db.createCollection('weather_cache');
 
 // Create indexes for better performance
 db.reports.createIndex({ "location.latitude": 1, "location.longitude": 1 });
+db.reports.createIndex({ "id": 1 }, { unique: true });
 db.reports.createIndex({ "created_at": -1 });
 db.reports.createIndex({ "severity": 1 });
 db.reports.createIndex({ "hazard_type": 1 });
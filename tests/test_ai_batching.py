@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+from server import AI_REQUIRED_FIELDS
+
+ANALYSIS = {
+    "hazard_type": "Flood",
+    "severity": "High",
+    "panic_index": 70,
+    "sentiment": "urgent",
+    "confidence_score": 0.8,
+    "verification_needed": False
+}
+OBJECT_INTERVAL = 0.05  # seconds between streamed objects
+
+
+class FakeChat:
+    """Streams one analysis object per OBJECT_INTERVAL, optionally stalling after some objects"""
+
+    def __init__(self, batched, stall_after=None):
+        self.batched = batched
+        self.stall_after = stall_after
+
+    async def send_message_stream(self, user_message):
+        if not self.batched:
+            await asyncio.sleep(OBJECT_INTERVAL)
+            yield json.dumps(ANALYSIS)
+            return
+
+        reports = json.loads(user_message.text.split(': ', 1)[1])
+        yield '['
+        for position, report in enumerate(reports):
+            if position == self.stall_after:
+                await asyncio.sleep(3600)
+            await asyncio.sleep(OBJECT_INTERVAL)
+            yield ('' if position == 0 else ', ') + json.dumps({"index": report["index"], **ANALYSIS})
+        yield ']'
+
+
+class NonStreamingChat:
+    """Replies in one piece, taking OBJECT_INTERVAL per analysis object it generates"""
+
+    def __init__(self, batched):
+        self.batched = batched
+
+    async def send_message(self, user_message):
+        if not self.batched:
+            await asyncio.sleep(OBJECT_INTERVAL)
+            return json.dumps(ANALYSIS)
+        reports = json.loads(user_message.text.split(': ', 1)[1])
+        await asyncio.sleep(OBJECT_INTERVAL * len(reports))
+        return json.dumps([{"index": report["index"], **ANALYSIS} for report in reports])
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Scale the timeouts down so objects arrive slower than the single-request budget allows for a batch"""
+    monkeypatch.setattr(server, "AI_REQUEST_TIMEOUT", OBJECT_INTERVAL * 3)
+    monkeypatch.setattr(server, "AI_BATCH_ITEM_TIMEOUT", OBJECT_INTERVAL * 2)
+    monkeypatch.setitem(server.ai_circuit_breaker, "failures", 0)
+    monkeypatch.setitem(server.ai_circuit_breaker, "open_until", 0.0)
+
+    def use(stall_after=None, streaming=True):
+        def create_analysis_chat(system_message):
+            batched = "JSON array" in system_message
+            return FakeChat(batched, stall_after) if streaming else NonStreamingChat(batched)
+        monkeypatch.setattr(server, "create_analysis_chat", create_analysis_chat)
+    return use
+
+
+def run_batch(size):
+    """Process one micro-batch of `size` reports; return each report's result or exception"""
+    async def main():
+        loop = asyncio.get_running_loop()
+        batch = [(f"report {index}", "en", loop.create_future()) for index in range(size)]
+        await server.process_ai_batch(batch)
+        return await asyncio.gather(*(future for _, _, future in batch), return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_full_batch_resolves_when_objects_stream_slower_than_one_request_budget(llm):
+    llm()
+    results = run_batch(server.AI_BATCH_MAX_SIZE)
+
+    assert all(isinstance(result, dict) for result in results)
+    assert all(result[field] == ANALYSIS[field] for result in results for field in AI_REQUIRED_FIELDS)
+    assert server.ai_circuit_breaker["failures"] == 0
+
+
+def test_stalled_batch_retries_remaining_reports_on_their_own(llm):
+    llm(stall_after=3)
+    results = run_batch(server.AI_BATCH_MAX_SIZE)
+
+    assert all(isinstance(result, dict) for result in results)
+    assert server.ai_circuit_breaker["failures"] == 0
+
+
+def test_batch_with_no_answer_fails_every_report_once(llm):
+    llm(stall_after=0)
+    results = run_batch(4)
+
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert server.ai_circuit_breaker["failures"] == 1
+
+
+def test_single_report_times_out_on_its_own_budget(llm, monkeypatch):
+    llm()
+    monkeypatch.setattr(server, "AI_REQUEST_TIMEOUT", OBJECT_INTERVAL / 2)
+    results = run_batch(1)
+
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert server.ai_circuit_breaker["failures"] == 1
+
+
+def test_batch_without_streaming_sends_each_report_on_its_own(llm):
+    llm(streaming=False)
+    results = run_batch(server.AI_BATCH_MAX_SIZE)
+
+    assert all(isinstance(result, dict) for result in results)
+    assert server.ai_circuit_breaker["failures"] == 0
+
+
+def test_caller_gives_up_at_its_own_deadline(llm, monkeypatch):
+    llm(stall_after=0)
+    monkeypatch.setattr(server, "AI_REQUEST_TIMEOUT", 3600)
+    monkeypatch.setattr(server, "AI_CALLER_TIMEOUT", OBJECT_INTERVAL * 4)
+    monkeypatch.setattr(server, "_ai_batch_queue", None)
+    monkeypatch.setattr(server, "_ai_batch_worker", None)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(
+            *(server.submit_ai_analysis(f"report {index}") for index in range(3)), return_exceptions=True
+        )
+        return results, loop.time() - started
+
+    results, elapsed = asyncio.run(main())
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert elapsed < OBJECT_INTERVAL * 8
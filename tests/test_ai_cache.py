@@ -0,0 +1,53 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import server
+
+
+def unit_vector(seed, dim=8):
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def cache_index(monkeypatch):
+    index = {}
+    monkeypatch.setattr(server, "_ai_cache_index", index)
+    return index
+
+
+def lookup(embedding, language='en'):
+    return asyncio.run(server.lookup_ai_cache(embedding, language))
+
+
+def test_lookup_returns_nearest_entry_above_threshold(cache_index):
+    for seed in range(40):
+        server._add_to_ai_cache_index(cache_index, f"key {seed}", 'en', unit_vector(seed), {"seed": seed})
+
+    assert lookup(unit_vector(17)) == {"seed": 17}
+    assert lookup(unit_vector(1000)) is None
+    assert lookup(unit_vector(17), language='hi') is None
+
+
+def test_replacing_a_key_reuses_its_row(cache_index):
+    server._add_to_ai_cache_index(cache_index, "key", 'en', unit_vector(1), {"version": 1})
+    server._add_to_ai_cache_index(cache_index, "key", 'en', unit_vector(2), {"version": 2})
+
+    assert len(cache_index['en']["results"]) == 1
+    assert lookup(unit_vector(2)) == {"version": 2}
+    assert lookup(unit_vector(1)) is None
+
+
+def test_full_cache_overwrites_oldest_entries(cache_index, monkeypatch):
+    monkeypatch.setattr(server, "AI_CACHE_MAX_ENTRIES", 20)
+    for seed in range(25):
+        server._add_to_ai_cache_index(cache_index, f"key {seed}", 'en', unit_vector(seed), {"seed": seed})
+
+    bucket = cache_index['en']
+    assert len(bucket["results"]) == 20
+    assert len(bucket["matrix"]) == 20
+    assert set(bucket["keys"]) == {f"key {seed}" for seed in range(5, 25)}
+    assert all(lookup(unit_vector(seed)) is None for seed in range(5))
+    assert all(lookup(unit_vector(seed)) == {"seed": seed} for seed in range(5, 25))
@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import server
+
+
+class FakeReports:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.updates = []
+
+    def find(self, query, projection=None):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        self.updates.append(update)
+        return {"severity": None, "panic_index": None}
+
+
+def analysis(**overrides):
+    return {"severity": "High", "panic_index": 70, "hazard_type": "Flood", "sentiment": "urgent", **overrides}
+
+
+def use_database(monkeypatch, reports):
+    async def update_report_stats(increments):
+        pass
+    monkeypatch.setattr(server, "db", SimpleNamespace(reports=reports))
+    monkeypatch.setattr(server, "update_report_stats", update_report_stats)
+
+
+def test_classification_clears_the_pending_marker(monkeypatch):
+    reports = FakeReports()
+    use_database(monkeypatch, reports)
+
+    asyncio.run(server.save_report_classification("a", analysis()))
+
+    assert reports.updates[0]["$unset"] == {"classification_status": ""}
+    assert "classification_status" not in reports.updates[0]["$set"]
+
+
+def test_fallback_classification_is_marked_degraded(monkeypatch):
+    reports = FakeReports()
+    use_database(monkeypatch, reports)
+
+    asyncio.run(server.save_report_classification("a", server.failed_ai_analysis()))
+
+    assert reports.updates[0]["$set"]["classification_status"] == server.CLASSIFICATION_DEGRADED
+    assert "$unset" not in reports.updates[0]
+
+
+def test_startup_requeues_pending_and_degraded_reports(monkeypatch):
+    use_database(monkeypatch, FakeReports([
+        {"id": "a", "description": "Water rising", "language": "en", "hazard_type": "Flood"},
+        {"id": "b", "description": "Oil on the beach"}
+    ]))
+    scheduled = []
+    monkeypatch.setattr(server, "schedule_reclassification", lambda *args: scheduled.append(args))
+
+    asyncio.run(server.resume_classifications())
+
+    assert scheduled == [("a", "Water rising", "en", "Flood"), ("b", "Oil on the beach", "en", None)]
+
+
+def test_failed_reclassification_still_stores_the_fallback(monkeypatch):
+    reports = FakeReports()
+    use_database(monkeypatch, reports)
+    monkeypatch.setattr(server, "AI_RETRY_DELAY", 0)
+
+    async def advanced_ai_analysis(text, language='en', hazard_type=None):
+        return server.failed_ai_analysis()
+    monkeypatch.setattr(server, "advanced_ai_analysis", advanced_ai_analysis)
+
+    asyncio.run(server.reclassify_report("a", "Water rising"))
+
+    assert reports.updates[0]["$set"]["severity"] == "Medium"
+    assert reports.updates[0]["$set"]["classification_status"] == server.CLASSIFICATION_DEGRADED
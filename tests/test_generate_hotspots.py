@@ -0,0 +1,140 @@
+import asyncio
+import random
+from collections import defaultdict
+
+import pytest
+
+import server
+
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+HAZARD_TYPES = ['Flood', 'Cyclone', 'Tsunami', 'Oil Spill']
+
+
+def reference_hotspots(reports, social_posts):
+    """The original pure-Python clustering, kept as the behaviour generate_hotspots must match"""
+    location_clusters = defaultdict(list)
+    for report in reports:
+        lat = round(report['location']['latitude'], 1)
+        lng = round(report['location']['longitude'], 1)
+        location_clusters[(lat, lng)].append(report)
+
+    hotspots = []
+    for (lat, lng), cluster_reports in location_clusters.items():
+        if len(cluster_reports) < 3:
+            continue
+        severity_dist = defaultdict(int)
+        hazard_types = defaultdict(int)
+        for report in cluster_reports:
+            severity_dist[report.get('severity', 'Medium')] += 1
+            hazard_types[report.get('hazard_type', 'Other')] += 1
+
+        high_severity_count = severity_dist.get('High', 0) + severity_dist.get('Critical', 0)
+        risk_ratio = high_severity_count / len(cluster_reports)
+        if risk_ratio >= 0.7:
+            risk_level = 'critical'
+        elif risk_ratio >= 0.4:
+            risk_level = 'high'
+        elif risk_ratio >= 0.2:
+            risk_level = 'medium'
+        else:
+            risk_level = 'low'
+
+        hotspots.append({
+            "center": (lat, lng),
+            "report_count": len(cluster_reports),
+            "social_media_count": len([
+                p for p in social_posts if p.get('location') and
+                abs(p['location']['latitude'] - lat) <= 0.1 and
+                abs(p['location']['longitude'] - lng) <= 0.1
+            ]),
+            "severity_distribution": dict(severity_dist),
+            "dominant_hazard_type": max(hazard_types.items(), key=lambda x: x[1])[0],
+            "confidence_score": min(0.9, 0.3 + (len(cluster_reports) * 0.1)),
+            "risk_level": risk_level
+        })
+    return hotspots
+
+
+def summarize(hotspot):
+    return {
+        "center": (hotspot.center_location.latitude, hotspot.center_location.longitude),
+        "report_count": hotspot.report_count,
+        "social_media_count": hotspot.social_media_count,
+        "severity_distribution": hotspot.severity_distribution,
+        "dominant_hazard_type": hotspot.dominant_hazard_type,
+        "confidence_score": hotspot.confidence_score,
+        "risk_level": hotspot.risk_level
+    }
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.docs)
+
+
+class FakeDatabase:
+    def __init__(self, reports, social_posts):
+        self.reports = FakeCollection(reports)
+        self.social_media = FakeCollection(social_posts)
+
+
+def random_location(rng, decimals):
+    return {
+        "latitude": round(rng.uniform(10.0, 10.6), decimals),
+        "longitude": round(rng.uniform(80.0, 80.6), decimals)
+    }
+
+
+def random_report(rng, decimals):
+    report = {"location": random_location(rng, decimals)}
+    # Missing fields fall back to the defaults
+    if rng.random() < 0.9:
+        report["severity"] = rng.choice(SEVERITIES)
+    if rng.random() < 0.9:
+        report["hazard_type"] = rng.choice(HAZARD_TYPES)
+    return report
+
+
+def random_post(rng, decimals):
+    return {"location": random_location(rng, decimals)} if rng.random() < 0.8 else {}
+
+
+@pytest.mark.parametrize("decimals", [2, 4])
+def test_matches_reference_implementation_on_random_data(monkeypatch, decimals):
+    for seed in range(300):
+        rng = random.Random(seed)
+        reports = [random_report(rng, decimals) for _ in range(rng.randint(1, 120))]
+        social_posts = [random_post(rng, decimals) for _ in range(rng.randint(0, 40))]
+        monkeypatch.setattr(server, "db", FakeDatabase(reports, social_posts))
+
+        hotspots = asyncio.run(server.generate_hotspots())
+
+        expected = sorted(reference_hotspots(reports, social_posts), key=lambda h: h["center"])
+        actual = sorted((summarize(h) for h in hotspots), key=lambda h: h["center"])
+        assert actual == expected, f"seed {seed}"
+
+
+def test_rounding_ties_use_python_round(monkeypatch):
+    # np.round(10.35, 1) is 10.4, but round(10.35, 1) is 10.3 (10.35 is stored just below)
+    reports = [{"location": {"latitude": 10.35, "longitude": 80.25}, "severity": "High", "hazard_type": "Flood"}] * 3
+    monkeypatch.setattr(server, "db", FakeDatabase(reports, []))
+
+    hotspots = asyncio.run(server.generate_hotspots())
+
+    assert [summarize(h)["center"] for h in hotspots] == [(round(10.35, 1), round(80.25, 1))]
+
+
+def test_no_reports_gives_no_hotspots(monkeypatch):
+    monkeypatch.setattr(server, "db", FakeDatabase([], [{"location": {"latitude": 10.0, "longitude": 80.0}}]))
+    assert asyncio.run(server.generate_hotspots()) == []
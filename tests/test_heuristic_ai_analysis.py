@@ -0,0 +1,79 @@
+import pytest
+
+from server import HEURISTIC_MINOR_KEYWORDS, HEURISTIC_URGENCY_KEYWORDS, heuristic_ai_analysis
+
+
+def test_clear_report_is_classified():
+    result = heuristic_ai_analysis("Massive tsunami waves hitting the harbour", hazard_type="Tsunami")
+    assert result["hazard_type"] == "Tsunami"
+    assert result["severity"] == "Critical"
+
+
+@pytest.mark.parametrize("text", [
+    "tsunami is not happening, false alarm",
+    "No tsunami, the warning was cancelled",
+    "Tsunami warning was a false alarm",
+    "Tsunami drill at the harbour this morning",
+    "Rumor of a tsunami spreading on WhatsApp",
+    "The cyclone didn't make landfall here",
+    "Flood warning called off for the coast",
+    "Minor flood, no danger to homes",
+])
+def test_negated_or_cancelled_reports_go_to_the_llm(text):
+    assert heuristic_ai_analysis(text, hazard_type="Tsunami") is None
+
+
+def test_words_containing_negations_do_not_bail_out():
+    result = heuristic_ai_analysis("Severe flood in North Chennai, water now waist deep", hazard_type="Flood")
+    assert result is not None
+    assert result["hazard_type"] == "Flood"
+
+
+def test_minor_wording_lowers_severity():
+    result = heuristic_ai_analysis("Small oil spill contained near the jetty", hazard_type="Oil Spill")
+    assert result["severity"] == "Low"
+
+
+def test_minor_keywords_do_not_contain_urgency_keywords():
+    # A minor phrase containing an urgency keyword would always count as mixed signals
+    for minor in HEURISTIC_MINOR_KEYWORDS:
+        assert not any(urgency in minor for urgency in HEURISTIC_URGENCY_KEYWORDS)
+
+
+class FakeEmbeddingModel:
+    def encode(self, text, normalize_embeddings=True):
+        import numpy as np
+        return np.ones(4) / 2
+
+
+def test_negated_reports_skip_the_semantic_cache(monkeypatch):
+    import asyncio
+
+    import server
+
+    looked_up, stored = [], []
+
+    async def lookup_ai_cache(embedding, language='en'):
+        looked_up.append(embedding)
+        return None
+
+    async def store_ai_cache(key, language, embedding, result):
+        stored.append(key)
+
+    async def submit_ai_analysis(text, language='en'):
+        return server.AIAnalysis(
+            hazard_type="Oil Spill", severity="Low", panic_index=10, sentiment="neutral",
+            confidence_score=0.9, verification_needed=False
+        ).model_dump()
+
+    monkeypatch.setattr(server, "_embedding_model", FakeEmbeddingModel())
+    monkeypatch.setattr(server, "lookup_ai_cache", lookup_ai_cache)
+    monkeypatch.setattr(server, "store_ai_cache", store_ai_cache)
+    monkeypatch.setattr(server, "submit_ai_analysis", submit_ai_analysis)
+    monkeypatch.setattr(server, "ai_exact_cache", {})
+
+    asyncio.run(server.advanced_ai_analysis("No black sheen along the shore after all, it was algae", hazard_type="Oil Spill"))
+    assert looked_up == [] and stored == []
+
+    asyncio.run(server.advanced_ai_analysis("Black sheen spreading along the shore, about a kilometre wide now", hazard_type="Oil Spill"))
+    assert len(looked_up) == 1 and len(stored) == 1
@@ -0,0 +1,53 @@
+import json
+
+from server import JsonArrayStreamParser
+
+ANALYSES = [
+    {"index": 0, "hazard_type": "Flood", "severity": "High", "extracted_keywords": ["flood", ["water", "rising"]]},
+    {"index": 1, "hazard_type": "Cyclone", "severity": "Critical", "location_mentions": {"coast": ["east", {"km": 3}]}},
+    {"index": 2, "hazard_type": "Other", "severity": "Low", "risk_assessment": 'He said "it\'s {fine}" [no] \\ \\"'}
+]
+
+
+def feed_chunks(parser, text, size=4):
+    """Feed text in fixed-size chunks; return the objects completed after each chunk"""
+    return [parser.feed(text[i:i + size]) for i in range(0, len(text), size)]
+
+
+def flatten(batches):
+    return [obj for batch in batches for obj in batch]
+
+
+def test_parses_array_inside_code_fence():
+    text = "```json\n" + json.dumps(ANALYSES) + "\n```"
+    assert flatten(feed_chunks(JsonArrayStreamParser(), text)) == ANALYSES
+
+
+def test_quotes_in_preamble_are_not_strings():
+    text = 'The "results" are: ' + json.dumps(ANALYSES)
+    assert flatten(feed_chunks(JsonArrayStreamParser(), text)) == ANALYSES
+
+
+def test_escaped_quotes_and_nested_values_inside_elements():
+    results = flatten(feed_chunks(JsonArrayStreamParser(), json.dumps(ANALYSES), size=1))
+    assert results == ANALYSES
+
+
+def test_elements_are_returned_as_soon_as_they_close():
+    text = json.dumps(ANALYSES)
+    first_end = text.index(json.dumps(ANALYSES[0])) + len(json.dumps(ANALYSES[0]))
+    parser = JsonArrayStreamParser()
+
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [ANALYSES[0]]
+
+
+def test_truncated_stream_returns_only_complete_elements():
+    text = json.dumps(ANALYSES)
+    truncated = text[:text.index('"index": 2') + 20]
+    assert flatten(feed_chunks(JsonArrayStreamParser(), truncated)) == ANALYSES[:2]
+
+
+def test_malformed_element_is_skipped():
+    text = '[{"index": 0, "severity": High}, ' + json.dumps(ANALYSES[1]) + ']'
+    assert flatten(feed_chunks(JsonArrayStreamParser(), text)) == [ANALYSES[1]]
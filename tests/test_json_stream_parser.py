@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+from server import AI_REQUIRED_FIELDS, JsonStreamParser
+
+ANALYSIS = {
+    "hazard_type": "Flood",
+    "severity": "High",
+    "panic_index": 70,
+    "sentiment": "urgent",
+    "confidence_score": 0.8,
+    "verification_needed": False,
+    "extracted_keywords": ["flood", "water"],
+    "risk_assessment": "Rising water"
+}
+
+
+def feed_chunks(parser, text, size=3):
+    """Feed text in fixed-size chunks; return the first parsed result and the chunks consumed"""
+    chunks = [text[i:i + size] for i in range(0, len(text), size)]
+    for consumed, chunk in enumerate(chunks, start=1):
+        result = parser.feed(chunk)
+        if result is not None:
+            return result, consumed
+    return None, len(chunks)
+
+
+def test_parses_object_inside_code_fence():
+    text = "```json\n" + json.dumps(ANALYSIS) + "\n```"
+    result, _ = feed_chunks(JsonStreamParser(), text)
+    assert result == ANALYSIS
+
+
+def test_quotes_in_preamble_are_not_strings():
+    text = 'Here is the "analysis": ' + json.dumps(ANALYSIS)
+    result, _ = feed_chunks(JsonStreamParser(), text)
+    assert result == ANALYSIS
+
+
+def test_escaped_quotes_and_braces_inside_strings():
+    analysis = {**ANALYSIS, "risk_assessment": 'Locals say "it\'s {worse} than [2019]" \\ \\"'}
+    result, _ = feed_chunks(JsonStreamParser(), json.dumps(analysis))
+    assert result == analysis
+
+
+def test_nested_arrays_and_objects():
+    analysis = {**ANALYSIS, "location_mentions": [["Chennai", "Marina"], {"coast": ["east", {"km": 3}]}]}
+    result, _ = feed_chunks(JsonStreamParser(), json.dumps(analysis))
+    assert result == analysis
+
+
+def test_returns_once_required_fields_are_decoded():
+    required = {field: ANALYSIS[field] for field in AI_REQUIRED_FIELDS}
+    text = json.dumps({**required, "recommended_actions": ["Evacuate"] * 50})
+    parser = JsonStreamParser(AI_REQUIRED_FIELDS)
+    result, consumed = feed_chunks(parser, text)
+
+    assert result == required
+    # Everything after the last required field was never needed
+    assert consumed * 3 < len(text) - len('"recommended_actions"')
+
+
+def test_does_not_exit_early_on_comma_inside_nested_value():
+    text = json.dumps({**ANALYSIS, "extracted_keywords": ["a", "b"]})
+    result, _ = feed_chunks(JsonStreamParser(("extracted_keywords",)), text)
+    assert result["extracted_keywords"] == ["a", "b"]
+
+
+def test_truncated_stream_fails_on_finish():
+    text = json.dumps(ANALYSIS)[:40]
+    parser = JsonStreamParser(AI_REQUIRED_FIELDS)
+    result, _ = feed_chunks(parser, text)
+
+    assert result is None
+    with pytest.raises(json.JSONDecodeError):
+        parser.finish()
+
+
+def test_reply_without_object_fails_on_finish():
+    parser = JsonStreamParser()
+    assert parser.feed("I cannot analyze this report.") is None
+    with pytest.raises(json.JSONDecodeError):
+        parser.finish()
+
+
+class FakeChat:
+    def __init__(self, reply, chunk_size=5):
+        self.reply = reply
+        self.chunk_size = chunk_size
+
+    async def send_message_stream(self, user_message):
+        for i in range(0, len(self.reply), self.chunk_size):
+            yield self.reply[i:i + self.chunk_size]
+
+
+def test_request_ai_analysis_rejects_object_missing_required_fields(monkeypatch):
+    incomplete = {"hazard_type": "Flood", "severity": "High"}
+    monkeypatch.setattr(server, "create_analysis_chat", lambda system_message: FakeChat(json.dumps(incomplete)))
+
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(server.request_ai_analysis("Water is rising"))
+
+
+def test_request_ai_analysis_fills_optional_defaults(monkeypatch):
+    required = {field: ANALYSIS[field] for field in AI_REQUIRED_FIELDS}
+    monkeypatch.setattr(server, "create_analysis_chat", lambda system_message: FakeChat(json.dumps(required)))
+
+    result = asyncio.run(server.request_ai_analysis("Water is rising"))
+    assert result == server.AIAnalysis(**required).model_dump()
+
+
+def test_request_ai_analysis_coerces_field_types(monkeypatch):
+    reply = {**{field: ANALYSIS[field] for field in AI_REQUIRED_FIELDS}, "panic_index": "75", "verification_needed": "true"}
+    monkeypatch.setattr(server, "create_analysis_chat", lambda system_message: FakeChat(json.dumps(reply)))
+
+    result = asyncio.run(server.request_ai_analysis("Water is rising"))
+    assert result["panic_index"] == 75
+    assert result["verification_needed"] is True
+
+
+@pytest.mark.parametrize("field, value", [("panic_index", None), ("panic_index", "high"), ("panic_index", 250), ("severity", None)])
+def test_request_ai_analysis_rejects_invalid_field_values(monkeypatch, field, value):
+    reply = {**{field: ANALYSIS[field] for field in AI_REQUIRED_FIELDS}, field: value}
+    monkeypatch.setattr(server, "create_analysis_chat", lambda system_message: FakeChat(json.dumps(reply)))
+
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(server.request_ai_analysis("Water is rising"))
@@ -0,0 +1,95 @@
+import pytest
+
+from server import is_allowed_media_type
+
+
+@pytest.mark.parametrize("content_type", ["image/jpeg", "image/png", "video/mp4", "audio/mpeg", "Image/PNG; charset=binary"])
+def test_passive_media_types_are_allowed(content_type):
+    assert is_allowed_media_type(content_type)
+
+
+@pytest.mark.parametrize("content_type", [None, "", "text/html", "image/svg+xml", "application/xhtml+xml", "application/javascript"])
+def test_renderable_or_unknown_types_are_rejected(content_type):
+    assert not is_allowed_media_type(content_type)
+
+
+def test_decode_inline_media_accepts_data_urls_and_wrapped_base64():
+    import base64
+
+    from server import MediaItem, decode_inline_media
+
+    payload = bytes(range(256)) * 4
+    encoded = base64.b64encode(payload).decode()
+    wrapped = "\r\n".join(encoded[i:i + 76] for i in range(0, len(encoded), 76))
+
+    assert decode_inline_media(MediaItem(type="image", base64_data=encoded)) == (payload, None)
+    assert decode_inline_media(MediaItem(type="image", base64_data=wrapped)) == (payload, None)
+    assert decode_inline_media(MediaItem(type="image", base64_data="data:image/png;base64," + wrapped)) == (payload, "image/png")
+    assert decode_inline_media(MediaItem(type="image")) is None
+
+
+def test_decode_inline_media_rejects_invalid_base64():
+    from fastapi import HTTPException
+
+    from server import MediaItem, decode_inline_media
+
+    with pytest.raises(HTTPException) as error:
+        decode_inline_media(MediaItem(type="image", base64_data="not base64!", filename="photo.jpg"))
+    assert error.value.status_code == 400
+
+
+class FakeReports:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        async def iterate():
+            for doc in self.docs:
+                if any(item.get("base64_data") for item in doc["media_items"]):
+                    yield dict(doc)
+        return iterate()
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if doc["_id"] == query["_id"]:
+                doc.update(update["$set"])
+
+
+class FakeBucket:
+    def __init__(self):
+        self.files = []
+
+    async def upload_from_stream(self, filename, content, metadata=None):
+        self.files.append((filename, content, metadata))
+        return f"file{len(self.files)}"
+
+
+def test_backfill_moves_legacy_base64_media_into_gridfs(monkeypatch):
+    import asyncio
+    import base64
+    from types import SimpleNamespace
+
+    import server
+
+    photo = b"\x89PNG photo"
+    reports = [
+        {"_id": 1, "id": "a", "media_items": [
+            {"type": "image", "base64_data": base64.b64encode(photo).decode(), "filename": "photo.png"},
+            {"type": "image", "url": "/api/media/existing"}
+        ]},
+        {"_id": 2, "id": "b", "media_items": [{"type": "image", "base64_data": "not base64!", "filename": "broken.jpg"}]}
+    ]
+    bucket = FakeBucket()
+    monkeypatch.setattr(server, "db", SimpleNamespace(reports=FakeReports(reports)))
+    monkeypatch.setattr(server, "media_bucket", bucket)
+
+    asyncio.run(server.backfill_inline_media())
+
+    assert bucket.files == [("photo.png", photo, {"content_type": "image/png"})]
+    migrated, untouched = reports[0]["media_items"], reports[1]["media_items"]
+    assert migrated[0]["base64_data"] is None
+    assert migrated[0]["url"] == "/api/media/file1"
+    assert migrated[0]["size"] == len(photo)
+    assert migrated[1]["url"] == "/api/media/existing"
+    # Undecodable blobs are left in place rather than lost
+    assert untouched[0]["base64_data"] == "not base64!"
@@ -0,0 +1,99 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+
+import server
+
+NOW = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def skip(self, count):
+        self.docs = self.docs[count:]
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(doc) for doc in self.docs]
+
+
+class FakeReports:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        minimum = query.get("base_priority_score", {}).get("$gte")
+        return FakeCursor([doc for doc in self.docs if minimum is None or doc["base_priority_score"] >= minimum])
+
+
+class FakeDatabase:
+    def __init__(self, reports):
+        self.reports = FakeReports(reports)
+
+
+def full_scan_ranking(reports):
+    """Score every report, as the endpoint did before the candidate window"""
+    scored = [
+        (report["id"], server.priority_score(report, server.base_priority_score(report.get("severity"), report.get("panic_index"))))
+        for report in reports
+    ]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:server.PRIORITY_REPORT_LIMIT]
+
+
+def random_report(rng, index):
+    # Up to 3 days old, or up to 2 days in the future (offline clients with a fast clock)
+    created_at = NOW - timedelta(hours=rng.uniform(-48, 72))
+    report = {
+        "id": f"report-{index}",
+        "severity": rng.choice(["Low", "Medium", "High", "Critical", None]),
+        "panic_index": rng.choice([None, rng.randint(0, 100)]),
+        "verification_status": rng.choice(["pending", "verified", "investigating"]),
+        "created_at": created_at.isoformat()
+    }
+    report["base_priority_score"] = server.base_priority_score(report["severity"], report["panic_index"])
+    return report
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(server, "datetime", FrozenDatetime)
+
+
+def test_matches_full_scan_ranking_on_random_data(monkeypatch, frozen_time):
+    for seed in range(300):
+        rng = random.Random(seed)
+        reports = [random_report(rng, index) for index in range(rng.randint(0, 200))]
+        monkeypatch.setattr(server, "db", FakeDatabase(reports))
+
+        response = asyncio.run(server.get_priority_reports())
+        ranking = [(item["report"]["id"], item["priority_score"]) for item in orjson.loads(response.body)]
+
+        assert ranking == full_scan_ranking(reports), f"seed {seed}"
+
+
+def test_future_reports_score_as_brand_new(frozen_time):
+    base_score = server.base_priority_score("Low", 10)
+    future = {"created_at": (NOW + timedelta(days=30)).isoformat()}
+    current = {"created_at": NOW.isoformat()}
+
+    assert server.priority_score(future, base_score) == server.priority_score(current, base_score)
@@ -0,0 +1,47 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+class FakeReports:
+    def __init__(self, previous):
+        self.previous = previous
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        return self.previous
+
+
+@pytest.fixture
+def stats_updates(monkeypatch):
+    updates = []
+
+    async def update_report_stats(increments):
+        updates.append(increments)
+    monkeypatch.setattr(server, "update_report_stats", update_report_stats)
+    return updates
+
+
+def classify(monkeypatch, previous, **result):
+    monkeypatch.setattr(server, "db", SimpleNamespace(reports=FakeReports(previous)))
+    ai_result = {"severity": "High", "panic_index": 70, "hazard_type": "Flood", "sentiment": "urgent", **result}
+    asyncio.run(server.save_report_classification("a", ai_result))
+
+
+def test_classification_moves_severity_and_panic_counters(monkeypatch, stats_updates):
+    classify(monkeypatch, {"severity": None, "panic_index": None})
+    assert stats_updates == [{"severity.none": -1, "severity.High": 1, "panic_sum": 20}]
+
+
+def test_missing_panic_index_counts_as_50(monkeypatch, stats_updates):
+    classify(monkeypatch, {"severity": "Medium", "panic_index": 80}, panic_index=None)
+    assert stats_updates == [{"severity.Medium": -1, "severity.High": 1, "panic_sum": -30}]
+
+
+def test_increments_remove_what_they_add():
+    report = {"severity": "Low", "verification_status": "pending", "source": "citizen_report", "language": "en", "panic_index": None}
+    merged = server.merge_stats_increments(server.report_stats_increments(report), server.report_stats_increments(report, -1))
+    assert merged == {}
+    assert server.report_stats_increments(report)["panic_sum"] == 50